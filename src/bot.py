@@ -1,30 +1,38 @@
+import gc
 import os
 import sys
+
+# Each call's audio math is tiny; concurrency comes from serving many calls, so
+# keep native math libraries single-threaded. Must run before numpy loads.
+for _thread_var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+    os.environ.setdefault(_thread_var, "1")
+
 from typing import Any
 
+from deepgram import LiveOptions
 from dotenv import load_dotenv
 from loguru import logger
 
 # Pipecat imports
-from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADParams
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
-from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
-from pipecat.services.cartesia.tts import CartesiaTTSService
 from pipecat.services.deepgram.stt import DeepgramSTTService
-from pipecat.services.openai.llm import OpenAILLMService
 from pipecat.transports.network.fastapi_websocket import (
     FastAPIWebsocketParams,
     FastAPIWebsocketTransport,
 )
-from pipecat.serializers.twilio import TwilioFrameSerializer
-from pipecat_flows import FlowManager
+from pipecat_flows import ContextStrategy, ContextStrategyConfig, FlowManager
 
 # Pipecat-flows imports
 
 
-from .medical_intake_flow import flow_config
+from .medical_intake_flow import (
+    COMPILED_FLOW_CONFIG,
+    STATIC_TTS_PHRASES,
+    address_validator,
+)
 
 # Project-specific imports
 # Assuming services.address_validator is in a directory reachable by Python's import system.
@@ -32,29 +40,106 @@ from .medical_intake_flow import flow_config
 # Or ensure PYTHONPATH is set up correctly.
 # For now, using the user's original import path from bot.py
 from .services.address_validator import AddressValidator
+from .services.cartesia_tts import PrerenderedCartesiaTTSService, prerender_phrases
+from .services.llm_context import WindowedOpenAILLMContext
+from .services.openai_llm import SharedClientOpenAILLMService, get_shared_openai_client
+from .services.silero_vad import SharedSileroVADAnalyzer, get_shared_vad_session
+from .services.twilio_serializer import LookupTableTwilioFrameSerializer
 
 load_dotenv(override=True)
 
 logger.remove(0)
-logger.add(sys.stderr, level="DEBUG")
+# enqueue=True hands log I/O to a background thread so writes never block the
+# event loop that is streaming call audio.
+logger.add(
+    sys.stderr,
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    enqueue=True,
+    backtrace=False,
+    diagnose=False,
+)
+if os.getenv("DEBUG"):
+    logger.add("debug.log", level="DEBUG", enqueue=True, rotation="100 MB")
+
+# Every call allocates short-lived frames 50 times a second, so a higher gen0
+# threshold keeps the collector from pausing the event loop mid-audio.
+gc.set_threshold(50_000, 50, 50)
+
+# --- Credentials (read once per process) ---
+_REQUIRED_ENV_VARS = (
+    "TWILIO_ACCOUNT_SID",
+    "TWILIO_AUTH_TOKEN",
+    "DEEPGRAM_API_KEY",
+    "CARTESIA_API_KEY",
+    "OPENAI_API_KEY",
+)
+_missing_env_vars = [name for name in _REQUIRED_ENV_VARS if not os.getenv(name)]
+if _missing_env_vars:
+    raise RuntimeError(
+        f"Missing required environment variables: {', '.join(_missing_env_vars)}"
+    )
+
+_TWILIO_SID = os.environ["TWILIO_ACCOUNT_SID"]
+_TWILIO_TOKEN = os.environ["TWILIO_AUTH_TOKEN"]
+_DEEPGRAM_KEY = os.environ["DEEPGRAM_API_KEY"]
+_CARTESIA_KEY = os.environ["CARTESIA_API_KEY"]
+_OPENAI_KEY = os.environ["OPENAI_API_KEY"]
+_OPENAI_MODEL = os.getenv("OPENAI_MODEL_NAME", "gpt-4.1-nano")
+_PROMPT_CACHE_KEY = "health-agent-intake"
+# Longest scripted reply is a NATO-spelled email; anything past this is a
+# runaway generation the caller would have to sit through.
+_MAX_COMPLETION_TOKENS = 400
+_CARTESIA_VOICE_ID = "71a7ad14-091c-4e8e-a314-022ece01c121"
+_CARTESIA_MODEL = "sonic-2"
+# Synthesize at Twilio's rate so output audio skips the resampler and goes
+# straight through the serializer's mu-law lookup table.
+_TTS_OUTPUT_FORMAT = {"container": "raw", "encoding": "pcm_s16le", "sample_rate": 8000}
 
 # --- Constants and Global Data ---
-BASE_SYSTEM_PROMPT = "You are a friendly, polite, and efficient medical office assistant. Your output will be converted to audio, so do not use any special characters like asterisks or lists. Speak in short, clear, and complete sentences. Only ask one question at a time, unless specified otherwise. Wait for the user to respond before moving to the next question. You must ALWAYS use one of the available functions to progress the conversation. If a user provides information that seems insufficient or incorrect for a function call, ask for clarification before calling the function."
+# Phone speech is short and turn-taking is quick, so end a user turn after
+# 250 ms of silence rather than Silero's conservative default.
+_VAD_PARAMS = VADParams(confidence=0.6, start_secs=0.1, stop_secs=0.25, min_volume=0.6)
+
+# PipelineTask only reads its params, so every call can share one instance.
+_PIPELINE_PARAMS = PipelineParams(
+    audio_in_sample_rate=8000,
+    audio_out_sample_rate=8000,
+    allow_interruptions=True,
+)
 
-AVAILABLE_APPOINTMENTS = [
-    {"doctor": "Dr. Smith", "day": "Monday", "time": "10:00 AM"},
-    {"doctor": "Dr. Jones", "day": "Tuesday", "time": "2:30 PM"},
-    {"doctor": "Dr. Lee", "day": "Wednesday", "time": "9:15 AM"},
-    {"doctor": "Dr. Brown", "day": "Friday", "time": "4:00 PM"},
-]
+
+async def warmup():
+    """
+    Load the VAD model and open the OpenAI connection before the first call.
+
+    Called once per worker at start-up so the first caller does not pay for
+    the model load or the TLS handshake. The fixed phrases are synthesized
+    here too, so calls play them from memory, and the USPS access token is
+    fetched ahead of the first address lookup.
+    """
+    get_shared_vad_session()
+    await prerender_phrases(
+        STATIC_TTS_PHRASES,
+        api_key=_CARTESIA_KEY,
+        voice_id=_CARTESIA_VOICE_ID,
+        model=_CARTESIA_MODEL,
+        output_format=_TTS_OUTPUT_FORMAT,
+    )
+    try:
+        await get_shared_openai_client(_OPENAI_KEY).models.retrieve(_OPENAI_MODEL)
+    except Exception as e:
+        logger.warning(f"Could not warm up the OpenAI connection: {e}")
+    if not await address_validator.ensure_access_token():
+        logger.warning("Could not fetch a USPS access token during warm-up")
+    logger.info("Warm-up finished")
 
 
 async def run_bot(websocket_client: Any, stream_sid: str, call_sid: str):
-    twilio_serializer = TwilioFrameSerializer(
+    twilio_serializer = LookupTableTwilioFrameSerializer(
         stream_sid=stream_sid,
         call_sid=call_sid,
-        account_sid=os.getenv("TWILIO_ACCOUNT_SID", ""),
-        auth_token=os.getenv("TWILIO_AUTH_TOKEN", ""),
+        account_sid=_TWILIO_SID,
+        auth_token=_TWILIO_TOKEN,
     )
 
     transport = FastAPIWebsocketTransport(
@@ -63,27 +148,55 @@ async def run_bot(websocket_client: Any, stream_sid: str, call_sid: str):
             audio_in_enabled=True,
             audio_out_enabled=True,
             add_wav_header=False,
-            vad_analyzer=SileroVADAnalyzer(),
+            vad_analyzer=SharedSileroVADAnalyzer(
+                get_shared_vad_session(), params=_VAD_PARAMS
+            ),
             serializer=twilio_serializer,
         ),
     )
 
-    stt = DeepgramSTTService(api_key=os.getenv("DEEPGRAM_API_KEY"))
+    # The serializer hands Deepgram 8 kHz linear PCM; the phone-call model is
+    # tuned for that channel. Endpointing finalizes 300 ms after speech ends.
+    stt = DeepgramSTTService(
+        api_key=_DEEPGRAM_KEY,
+        live_options=LiveOptions(
+            model="nova-2-phonecall",
+            language="en-US",
+            encoding="linear16",
+            sample_rate=8000,
+            channels=1,
+            interim_results=True,
+            smart_format=True,
+            punctuate=True,
+            endpointing=300,
+            no_delay=True,
+        ),
+    )
 
-    cartesia_api_key = os.getenv("CARTESIA_API_KEY")
-    if not cartesia_api_key:
-        logger.error("CARTESIA_API_KEY environment variable not found!")
-    tts = CartesiaTTSService(
-        api_key=cartesia_api_key,
-        voice_id="71a7ad14-091c-4e8e-a314-022ece01c121",
+    tts = PrerenderedCartesiaTTSService(
+        api_key=_CARTESIA_KEY,
+        voice_id=_CARTESIA_VOICE_ID,
+        model=_CARTESIA_MODEL,
+        sample_rate=_TTS_OUTPUT_FORMAT["sample_rate"],
+        encoding=_TTS_OUTPUT_FORMAT["encoding"],
+        container=_TTS_OUTPUT_FORMAT["container"],
+        push_silence_after_stop=False,
     )
 
-    llm = OpenAILLMService(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        model=os.getenv("OPENAI_MODEL_NAME", "gpt-4.1-nano"),
+    # Every call opens with the same role prompt and tool schemas. A fixed
+    # cache key routes them to the same OpenAI prompt-cache shard so that
+    # prefix is served from cache, not re-prefilled each turn. Completions
+    # always stream, and Cartesia starts on the first full sentence.
+    llm = SharedClientOpenAILLMService(
+        api_key=_OPENAI_KEY,
+        model=_OPENAI_MODEL,
+        params=SharedClientOpenAILLMService.InputParams(
+            max_completion_tokens=_MAX_COMPLETION_TOKENS,
+            extra={"extra_body": {"prompt_cache_key": _PROMPT_CACHE_KEY}},
+        ),
     )
 
-    llm_history_context = OpenAILLMContext()
+    llm_history_context = WindowedOpenAILLMContext()
     context_aggregator = llm.create_context_aggregator(llm_history_context)
 
     pipeline = Pipeline(
@@ -98,21 +211,17 @@ async def run_bot(websocket_client: Any, stream_sid: str, call_sid: str):
         ]
     )
 
-    task = PipelineTask(
-        pipeline,
-        params=PipelineParams(
-            audio_in_sample_rate=8000,
-            audio_out_sample_rate=8000,
-            allow_interruptions=True,
-        ),
-    )
+    task = PipelineTask(pipeline, params=_PIPELINE_PARAMS)
 
     flow_manager = FlowManager(
         task=task,
         llm=llm,
         context_aggregator=context_aggregator,
         tts=tts,
-        flow_config=flow_config,
+        flow_config=COMPILED_FLOW_CONFIG,
+        # Nodes append by default, so the cached prompt prefix survives a
+        # transition. Section-start nodes opt into RESET in the flow config.
+        context_strategy=ContextStrategyConfig(strategy=ContextStrategy.APPEND),
     )
 
     @transport.event_handler("on_client_connected")
@@ -124,8 +233,11 @@ async def run_bot(websocket_client: Any, stream_sid: str, call_sid: str):
     async def on_client_disconnected(transport_instance, client):
         logger.info(f"Client {client} disconnected from transport")
         await task.cancel()
+        # No audio is in flight for this call any more; sweep only the young
+        # generation so other calls on the loop are not stalled.
+        gc.collect(0)
 
-    runner = PipelineRunner(handle_sigint=False, force_gc=True)
+    runner = PipelineRunner(handle_sigint=False, force_gc=False)
     logger.info("Starting AssortHealth Flow Bot pipeline runner...")
     await runner.run(task)
     logger.info("AssortHealth Flow Bot pipeline task finished.")
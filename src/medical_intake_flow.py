@@ -13,18 +13,23 @@
 # - Provider appointment scheduling
 #
 
+import asyncio
+import functools
 import os
 import sys
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict
 import usaddress  # Add this import
 import re  # Added for email regex parsing
 
 from dotenv import load_dotenv
 from loguru import logger
-
+from pipecat.frames.frames import TTSSpeakFrame
 
 from pipecat_flows import (
+    ContextStrategy,
+    ContextStrategyConfig,
     FlowArgs,
     FlowManager,
     FlowResult,
@@ -36,6 +41,10 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 load_dotenv(override=True)
 
+# USPS credentials are read once per process, like the bot's other keys
+USPS_CLIENT_ID = os.getenv("USPS_CLIENT_ID")
+USPS_CLIENT_SECRET = os.getenv("USPS_CLIENT_SECRET")
+
 # Import email service
 from .services.email_service import EmailService
 from .services.address_validator import AddressValidator
@@ -89,69 +98,134 @@ NATO_PHONETIC_ALPHABET = {
 }
 
 
+# Whitespace ASR can put between spelled letters and digits, including NBSP
+_SPELLING_WHITESPACE = dict.fromkeys(map(ord, " \t\n\r\xa0"), None)
+
+# Everything int() would reject in a spoken ID
+_NONDIGIT_RE = re.compile(r"\D+")
+
+
 # Helper function to convert spaced letters to word
 def spaced_letters_to_word(spaced_text: str) -> str:
     """Convert spaced letters like 'a s a d' to 'asad'."""
     # Remove spaces and convert to lowercase
-    return spaced_text.replace(" ", "").lower()
+    return spaced_text.translate(_SPELLING_WHITESPACE).lower()
+
+
+# Each printable ASCII character maps to its capital plus the joining space,
+# and whitespace is dropped, so ASCII text is spelled by one str.translate call
+_SPELL_OUT_TABLE = {
+    code: (None if chr(code).isspace() else chr(code).upper() + " ")
+    for code in range(128)
+}
+
+
+# Helper function to spell text out letter by letter
+def spell_out(text: str) -> str:
+    """
+    Spell text out as spaced capitals, skipping whitespace.
+
+    Punctuation is kept so the patient can confirm it, e.g. "Mary-Ann O'Brien"
+    becomes "M A R Y - A N N O ' B R I E N".
+    """
+    if text.isascii():
+        return text.translate(_SPELL_OUT_TABLE)[:-1]
+    return " ".join(char for char in text.upper() if not char.isspace())
 
 
 # Helper function to remove spaces (preserving case)
 def remove_spaces(spaced_text: str) -> str:
     """Remove spaces from text like '1 2 3' to '123' or 'N Y' to 'NY'."""
-    return spaced_text.replace(" ", "")
+    return spaced_text.translate(_SPELLING_WHITESPACE)
+
+
+def _address_spelling_token(char: str):
+    """Spoken form of one address character, or None to skip it."""
+    if char == " ":
+        # Keep spaces to maintain word boundaries
+        return "  "  # Double space for clearer pauses
+    if char == ",":
+        return " comma "
+    if char.isalnum():
+        return char.upper()
+    # Skip other punctuation
+    return None
+
+
+# Each ASCII character maps to its spoken token plus the joining space, so an
+# ASCII address is spelled by one str.translate call
+_ADDRESS_SPELLING_TABLE = {
+    code: (token + " " if token is not None else None)
+    for code, token in (
+        (code, _address_spelling_token(chr(code))) for code in range(128)
+    )
+}
 
 
 # Helper function to format address for character-by-character spelling
 def format_address_for_spelling(address: str) -> str:
     """Format address for character-by-character spelling, preserving structure."""
-    result = []
-    for char in address:
-        if char == " ":
-            # Keep spaces to maintain word boundaries
-            result.append("  ")  # Double space for clearer pauses
-        elif char == ",":
-            result.append(" comma ")
-        elif char.isalnum():
-            result.append(char.upper())
-        # Skip other punctuation
-    return " ".join(result)
+    if address.isascii():
+        return address.translate(_ADDRESS_SPELLING_TABLE)[:-1]
+    tokens = (_address_spelling_token(char) for char in address)
+    return " ".join(token for token in tokens if token is not None)
+
+
+# Role prompt set by the initial node and by each section-start node, so it
+# stays the identical prefix of every LLM request in a call.
+BASE_SYSTEM_PROMPT = sys.intern(
+    "You are a friendly, polite, and efficient medical office assistant. Your output will be converted to audio, so do not use any special characters like asterisks or lists. Speak in short, clear, and complete sentences. Only ask one question at a time, unless specified otherwise. Wait for the user to respond before moving to the next question. You must ALWAYS use one of the available functions to progress the conversation. If a user provides information that seems insufficient or incorrect for a function call, ask for clarification before calling the function."
+    " Never use emojis."
+    " IMPORTANT: You must first ASK questions and wait for the user to respond before calling any functions."
+    " Never call a function with your own question as the parameter value."
+)
 
 
 # Mock provider schedule with doctors
-AVAILABLE_APPOINTMENTS = [
-    {
-        "time": "Monday, December 18 at 9:00 AM",
-        "doctor": "Dr. Sarah Johnson",
-        "specialty": "Internal Medicine",
-    },
-    {
-        "time": "Monday, December 18 at 10:30 AM",
-        "doctor": "Dr. Michael Chen",
-        "specialty": "Cardiology",
-    },
-    {
-        "time": "Tuesday, December 19 at 2:00 PM",
-        "doctor": "Dr. Emily Rodriguez",
-        "specialty": "Family Medicine",
-    },
-    {
-        "time": "Wednesday, December 20 at 11:00 AM",
-        "doctor": "Dr. David Thompson",
-        "specialty": "Orthopedics",
-    },
-    {
-        "time": "Thursday, December 21 at 3:30 PM",
-        "doctor": "Dr. Lisa Park",
-        "specialty": "Dermatology",
-    },
-]
+AVAILABLE_APPOINTMENTS = tuple(
+    MappingProxyType(appointment)
+    for appointment in [
+        {
+            "time": "Monday, December 18 at 9:00 AM",
+            "doctor": "Dr. Sarah Johnson",
+            "specialty": "Internal Medicine",
+        },
+        {
+            "time": "Monday, December 18 at 10:30 AM",
+            "doctor": "Dr. Michael Chen",
+            "specialty": "Cardiology",
+        },
+        {
+            "time": "Tuesday, December 19 at 2:00 PM",
+            "doctor": "Dr. Emily Rodriguez",
+            "specialty": "Family Medicine",
+        },
+        {
+            "time": "Wednesday, December 20 at 11:00 AM",
+            "doctor": "Dr. David Thompson",
+            "specialty": "Orthopedics",
+        },
+        {
+            "time": "Thursday, December 21 at 3:30 PM",
+            "doctor": "Dr. Lisa Park",
+            "specialty": "Dermatology",
+        },
+    ]
+)
 
 # Extract just the times for backward compatibility
 AVAILABLE_TIMES = [apt["time"] for apt in AVAILABLE_APPOINTMENTS]
 
+# The slot listing read out by the scheduling node never changes, so build it once.
+AVAILABLE_APPOINTMENTS_LISTING = sys.intern(
+    "\\n".join(
+        f"- {apt['time']} with {apt['doctor']} ({apt['specialty']})"
+        for apt in AVAILABLE_APPOINTMENTS
+    )
+)
+
 address_validator = AddressValidator(
-    client_id=os.getenv("USPS_CLIENT_ID"), client_secret=os.getenv("USPS_CLIENT_SECRET")
+    client_id=USPS_CLIENT_ID, client_secret=USPS_CLIENT_SECRET
 )
 
 # Initialize email service
@@ -209,43 +283,53 @@ class AppointmentResult(FlowResult):
 
 
 # Function handlers
-async def collect_first_name(args: FlowArgs) -> NameResult:
-    """Collect patient's first name."""
-    return NameResult(name=args["first_name"])
+def _make_collector(result_type: type, result_key: str, arg_key: str):
+    """
+    Build a handler that copies one LLM argument into a flow result.
 
+    Args:
+        result_type (type): The FlowResult subclass to return.
+        result_key (str): The result field to fill.
+        arg_key (str): The function argument to read.
 
-async def confirm_first_name_spelling(args: FlowArgs) -> SpellingConfirmationResult:
-    """Confirm first name spelling."""
-    return SpellingConfirmationResult(
-        confirmed=args["confirmed"],
-        corrected_spelling=args.get("corrected_spelling", ""),
-    )
+    Returns:
+        The async function handler.
+    """
 
+    async def handler(args: FlowArgs) -> FlowResult:
+        return result_type(**{result_key: args[arg_key]})
 
-async def collect_last_name(args: FlowArgs) -> NameResult:
-    """Collect patient's last name."""
-    return NameResult(name=args["last_name"])
+    return handler
 
 
-async def confirm_last_name_spelling(args: FlowArgs) -> SpellingConfirmationResult:
-    """Confirm last name spelling."""
-    return SpellingConfirmationResult(
-        confirmed=args["confirmed"],
-        corrected_spelling=args.get("corrected_spelling", ""),
-    )
+def _make_spelling_confirmer(corrected_key: str):
+    """
+    Build a handler for a yes/no spelling confirmation with an optional fix.
 
+    Args:
+        corrected_key (str): The function argument holding the correction.
 
-async def collect_payer_name(args: FlowArgs) -> NameResult:
-    """Collect insurance payer name."""
-    return NameResult(name=args["payer_name"])
+    Returns:
+        The async function handler.
+    """
 
+    async def handler(args: FlowArgs) -> SpellingConfirmationResult:
+        return SpellingConfirmationResult(
+            confirmed=args["confirmed"],
+            corrected_spelling=args.get(corrected_key, ""),
+        )
 
-async def confirm_payer_spelling(args: FlowArgs) -> SpellingConfirmationResult:
-    """Confirm payer name spelling."""
-    return SpellingConfirmationResult(
-        confirmed=args["confirmed"],
-        corrected_spelling=args.get("corrected_spelling", ""),
-    )
+    return handler
+
+
+confirm_spelling = _make_spelling_confirmer("corrected_spelling")
+
+collect_first_name = _make_collector(NameResult, "name", "first_name")
+confirm_first_name_spelling = confirm_spelling
+collect_last_name = _make_collector(NameResult, "name", "last_name")
+confirm_last_name_spelling = confirm_spelling
+collect_payer_name = _make_collector(NameResult, "name", "payer_name")
+confirm_payer_spelling = confirm_spelling
 
 
 async def collect_payer_id(args: FlowArgs) -> PayerIdResult:
@@ -258,7 +342,7 @@ async def collect_payer_id(args: FlowArgs) -> PayerIdResult:
         return PayerIdResult(payer_id=payer_id_int)
     except (ValueError, TypeError):
         # If conversion fails, try to extract just numbers
-        numbers_only = "".join(filter(str.isdigit, str(payer_id_str)))
+        numbers_only = _NONDIGIT_RE.sub("", str(payer_id_str))
         if numbers_only:
             return PayerIdResult(payer_id=int(numbers_only))
         else:
@@ -280,7 +364,7 @@ async def confirm_payer_id(args: FlowArgs) -> PayerIdConfirmationResult:
             )
         except (ValueError, TypeError):
             # If conversion fails, try to extract just numbers
-            numbers_only = "".join(filter(str.isdigit, str(corrected_id_str)))
+            numbers_only = _NONDIGIT_RE.sub("", str(corrected_id_str))
             if numbers_only:
                 return PayerIdConfirmationResult(
                     confirmed=confirmed, corrected_id=int(numbers_only)
@@ -293,57 +377,18 @@ async def confirm_payer_id(args: FlowArgs) -> PayerIdConfirmationResult:
         return PayerIdConfirmationResult(confirmed=confirmed, corrected_id=0)
 
 
-async def check_referral_status(args: FlowArgs) -> ReferralStatusResult:
-    """Check if patient has a referral."""
-    return ReferralStatusResult(has_referral=args["has_referral"])
-
-
-async def collect_physician_first_name(args: FlowArgs) -> NameResult:
-    """Collect referring physician's first name."""
-    return NameResult(name=args["physician_first_name"])
-
-
-async def confirm_physician_first_name_spelling(
-    args: FlowArgs,
-) -> SpellingConfirmationResult:
-    """Confirm physician first name spelling."""
-    return SpellingConfirmationResult(
-        confirmed=args["confirmed"],
-        corrected_spelling=args.get("corrected_spelling", ""),
-    )
-
-
-async def collect_physician_last_name(args: FlowArgs) -> NameResult:
-    """Collect referring physician's last name."""
-    return NameResult(name=args["physician_last_name"])
-
-
-async def confirm_physician_last_name_spelling(
-    args: FlowArgs,
-) -> SpellingConfirmationResult:
-    """Confirm physician last name spelling."""
-    return SpellingConfirmationResult(
-        confirmed=args["confirmed"],
-        corrected_spelling=args.get("corrected_spelling", ""),
-    )
-
-
-async def collect_chief_complaint(args: FlowArgs) -> ComplaintResult:
-    """Collect chief medical complaint."""
-    return ComplaintResult(complaint=args["complaint"])
-
-
-async def collect_full_address(args: FlowArgs) -> AddressComponentResult:
-    """Collect full address."""
-    return AddressComponentResult(value=args["address"])
-
-
-async def confirm_full_address(args: FlowArgs) -> SpellingConfirmationResult:
-    """Confirm full address."""
-    return SpellingConfirmationResult(
-        confirmed=args["confirmed"],
-        corrected_spelling=args.get("corrected_address", ""),
-    )
+check_referral_status = _make_collector(
+    ReferralStatusResult, "has_referral", "has_referral"
+)
+collect_physician_first_name = _make_collector(
+    NameResult, "name", "physician_first_name"
+)
+confirm_physician_first_name_spelling = confirm_spelling
+collect_physician_last_name = _make_collector(NameResult, "name", "physician_last_name")
+confirm_physician_last_name_spelling = confirm_spelling
+collect_chief_complaint = _make_collector(ComplaintResult, "complaint", "complaint")
+collect_full_address = _make_collector(AddressComponentResult, "value", "address")
+confirm_full_address = _make_spelling_confirmer("corrected_address")
 
 
 async def restart_address_collection(args: FlowArgs) -> FlowResult:
@@ -351,37 +396,80 @@ async def restart_address_collection(args: FlowArgs) -> FlowResult:
     return FlowResult(status="restarting")
 
 
-async def collect_phone(args: FlowArgs) -> ContactResult:
-    """Collect phone number."""
-    return ContactResult(contact_info=args["phone_number"])
+collect_phone = _make_collector(ContactResult, "contact_info", "phone_number")
+collect_email = _make_collector(ContactResult, "contact_info", "email")
+confirm_email_spelling = confirm_spelling
+ask_email_preference = _make_collector(
+    EmailPreferenceResult, "wants_email", "wants_email"
+)
+select_appointment = _make_collector(
+    AppointmentResult, "selected_time", "selected_time"
+)
 
 
-async def collect_email(args: FlowArgs) -> ContactResult:
-    """Collect patient's email address."""
-    return ContactResult(contact_info=args["email"])
+async def end_intake(args: FlowArgs) -> FlowResult:
+    """Complete the intake process."""
+    return FlowResult(status="completed")
 
 
-async def confirm_email_spelling(args: FlowArgs) -> SpellingConfirmationResult:
-    """Confirm email spelling."""
-    return SpellingConfirmationResult(
-        confirmed=args["confirmed"],
-        corrected_spelling=args.get("corrected_spelling", ""),
-    )
+# State each node discards before it re-collects its data
+NODE_CLEAR_KEYS = MappingProxyType(
+    {
+        "collect_full_address": frozenset({"full_address"}),
+        "collect_house_number": frozenset(
+            {"house_number", "street_name", "city", "state", "zip_code"}
+        ),
+    }
+)
 
 
-async def ask_email_preference(args: FlowArgs) -> EmailPreferenceResult:
-    """Ask if patient wants to provide email."""
-    return EmailPreferenceResult(wants_email=args["wants_email"])
+def _clear_state(flow_manager: FlowManager, node: str):
+    """Drop the state keys that `node` is about to collect again."""
+    state = flow_manager.state
+    for key in NODE_CLEAR_KEYS.get(node, frozenset()).intersection(state):
+        del state[key]
 
 
-async def select_appointment(args: FlowArgs) -> AppointmentResult:
-    """Select appointment time."""
-    return AppointmentResult(selected_time=args["selected_time"])
+def _make_spelling_confirmation_transition(
+    state_key: str,
+    confirm_node: str,
+    confirm_factory,
+    next_node: str,
+    next_factory,
+):
+    """
+    Build the transition for a spelled-name confirmation.
+
+    A confirmed spelling moves on to `next_node`. A correction is stored and
+    confirmed again, and a bare "no" repeats the confirmation.
+
+    Args:
+        state_key (str): The flow state key holding the name.
+        confirm_node (str): Name of the confirmation node.
+        confirm_factory: Builds the confirmation node for a name.
+        next_node (str): Name of the node after a confirmed spelling.
+        next_factory: Builds the next node.
+
+    Returns:
+        The async transition callback.
+    """
+
+    async def transition(
+        args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
+    ):
+        if result["confirmed"]:
+            await flow_manager.set_node(next_node, next_factory())
+            return
 
+        if result["corrected_spelling"]:
+            # Convert spaced letters back to word
+            name = spaced_letters_to_word(result["corrected_spelling"])
+            flow_manager.state[state_key] = name
+        else:
+            name = flow_manager.state.get(state_key, "")
+        await flow_manager.set_node(confirm_node, confirm_factory(name))
 
-async def end_intake(args: FlowArgs) -> FlowResult:
-    """Complete the intake process."""
-    return FlowResult(status="completed")
+    return transition
 
 
 # Transition handlers
@@ -395,34 +483,6 @@ async def handle_first_name_collection(
     )
 
 
-async def handle_first_name_confirmation(
-    args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
-):
-    """Handle first name confirmation."""
-    if result["confirmed"]:
-        # Spelling confirmed, move to next step
-        await flow_manager.set_node(
-            "collect_last_name", create_collect_last_name_node()
-        )
-    else:
-        # User provided correction, update and confirm again
-        if result["corrected_spelling"]:
-            # Convert spaced letters back to word
-            corrected_name = spaced_letters_to_word(result["corrected_spelling"])
-            flow_manager.state["first_name"] = corrected_name
-            # Loop back to confirm the new spelling
-            await flow_manager.set_node(
-                "confirm_first_name",
-                create_confirm_first_name_node(corrected_name),
-            )
-        else:
-            # No correction provided, ask again
-            current_name = flow_manager.state.get("first_name", "")
-            await flow_manager.set_node(
-                "confirm_first_name", create_confirm_first_name_node(current_name)
-            )
-
-
 async def handle_last_name_collection(
     args: Dict, result: NameResult, flow_manager: FlowManager
 ):
@@ -433,34 +493,6 @@ async def handle_last_name_collection(
     )
 
 
-async def handle_last_name_confirmation(
-    args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
-):
-    """Handle last name confirmation."""
-    if result["confirmed"]:
-        # Spelling confirmed, move to next step
-        await flow_manager.set_node(
-            "collect_payer_name", create_collect_payer_name_node()
-        )
-    else:
-        # User provided correction, update and confirm again
-        if result["corrected_spelling"]:
-            # Convert spaced letters back to word
-            corrected_name = spaced_letters_to_word(result["corrected_spelling"])
-            flow_manager.state["last_name"] = corrected_name
-            # Loop back to confirm the new spelling
-            await flow_manager.set_node(
-                "confirm_last_name",
-                create_confirm_last_name_node(corrected_name),
-            )
-        else:
-            # No correction provided, ask again
-            current_name = flow_manager.state.get("last_name", "")
-            await flow_manager.set_node(
-                "confirm_last_name", create_confirm_last_name_node(current_name)
-            )
-
-
 async def handle_payer_name_collection(
     args: Dict, result: NameResult, flow_manager: FlowManager
 ):
@@ -471,32 +503,6 @@ async def handle_payer_name_collection(
     )
 
 
-async def handle_payer_name_confirmation(
-    args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
-):
-    """Handle payer name confirmation."""
-    if result["confirmed"]:
-        # Spelling confirmed, move to next step
-        await flow_manager.set_node("collect_payer_id", create_collect_payer_id_node())
-    else:
-        # User provided correction, update and confirm again
-        if result["corrected_spelling"]:
-            # Convert spaced letters back to word
-            corrected_name = spaced_letters_to_word(result["corrected_spelling"])
-            flow_manager.state["payer_name"] = corrected_name
-            # Loop back to confirm the new spelling
-            await flow_manager.set_node(
-                "confirm_payer_name",
-                create_confirm_payer_name_node(corrected_name),
-            )
-        else:
-            # No correction provided, ask again
-            current_name = flow_manager.state.get("payer_name", "")
-            await flow_manager.set_node(
-                "confirm_payer_name", create_confirm_payer_name_node(current_name)
-            )
-
-
 async def handle_payer_id_collection(
     args: Dict, result: PayerIdResult, flow_manager: FlowManager
 ):
@@ -557,35 +563,6 @@ async def handle_physician_first_name_collection(
     )
 
 
-async def handle_physician_first_name_confirmation(
-    args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
-):
-    """Handle physician first name confirmation."""
-    if result["confirmed"]:
-        # Spelling confirmed, move to next step
-        await flow_manager.set_node(
-            "collect_physician_last_name", create_collect_physician_last_name_node()
-        )
-    else:
-        # User provided correction, update and confirm again
-        if result["corrected_spelling"]:
-            # Convert spaced letters back to word
-            corrected_name = spaced_letters_to_word(result["corrected_spelling"])
-            flow_manager.state["physician_first_name"] = corrected_name
-            # Loop back to confirm the new spelling
-            await flow_manager.set_node(
-                "confirm_physician_first_name",
-                create_confirm_physician_first_name_node(corrected_name),
-            )
-        else:
-            # No correction provided, ask again
-            current_name = flow_manager.state.get("physician_first_name", "")
-            await flow_manager.set_node(
-                "confirm_physician_first_name",
-                create_confirm_physician_first_name_node(current_name),
-            )
-
-
 async def handle_physician_last_name_collection(
     args: Dict, result: NameResult, flow_manager: FlowManager
 ):
@@ -597,35 +574,6 @@ async def handle_physician_last_name_collection(
     )
 
 
-async def handle_physician_last_name_confirmation(
-    args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
-):
-    """Handle physician last name confirmation."""
-    if result["confirmed"]:
-        # Spelling confirmed, move to next step
-        await flow_manager.set_node(
-            "collect_complaint", create_collect_complaint_node()
-        )
-    else:
-        # User provided correction, update and confirm again
-        if result["corrected_spelling"]:
-            # Convert spaced letters back to word
-            corrected_name = spaced_letters_to_word(result["corrected_spelling"])
-            flow_manager.state["physician_last_name"] = corrected_name
-            # Loop back to confirm the new spelling
-            await flow_manager.set_node(
-                "confirm_physician_last_name",
-                create_confirm_physician_last_name_node(corrected_name),
-            )
-        else:
-            # No correction provided, ask again
-            current_name = flow_manager.state.get("physician_last_name", "")
-            await flow_manager.set_node(
-                "confirm_physician_last_name",
-                create_confirm_physician_last_name_node(current_name),
-            )
-
-
 async def handle_complaint_collection(
     args: Dict, result: ComplaintResult, flow_manager: FlowManager
 ):
@@ -646,13 +594,9 @@ async def handle_full_address_collection(
     )
 
 
-async def handle_full_address_confirmation(
-    args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
-):
-    """Handle full address confirmation using usaddress parsing."""
-    # Define a mapping for state names to abbreviations
-    # This can be expanded as needed
-    state_name_to_abbreviation = {
+# Full state name, casefolded, to its USPS abbreviation
+_STATE_NAME_TO_ABBREVIATION = MappingProxyType(
+    {
         "alabama": "AL",
         "alaska": "AK",
         "arizona": "AZ",
@@ -704,28 +648,141 @@ async def handle_full_address_confirmation(
         "wisconsin": "WI",
         "wyoming": "WY",
     }
+)
+
+# The abbreviations themselves, for addresses that already use them ("NY")
+_STATE_ABBREVIATIONS = frozenset(map(sys.intern, _STATE_NAME_TO_ABBREVIATION.values()))
+
+
+def _state_abbreviation(state: str):
+    """Return the USPS abbreviation for a state name or code, or None."""
+    key = state.strip().casefold()
+    abbreviation = _STATE_NAME_TO_ABBREVIATION.get(key)
+    if abbreviation is None:
+        # Accept "NY", "ny" and "N.Y." as well as the full name
+        code = remove_spaces(key).replace(".", "").upper()
+        if code in _STATE_ABBREVIATIONS:
+            abbreviation = code
+    return abbreviation
+
+
+# USPS lookups slower than this are skipped so the caller is never left waiting
+ADDRESS_VALIDATION_TIMEOUT_SECS = 1.5
+
+# AddressValidator statuses where USPS vouched for the address
+_ACCEPTED_ADDRESS_STATUSES = frozenset(
+    {"VALID", "VALID_WITH_CHANGES", "VALID_WITH_ISSUES"}
+)
+# AddressValidator statuses that send the patient back to re-enter it
+_REJECTED_ADDRESS_STATUSES = frozenset({"INVALID"})
+# Anything else (UNKNOWN_DPV, API_ERROR, ERROR, or a timeout) means the lookup
+# itself failed. The intake fails open and keeps the address the patient
+# confirmed rather than blocking the call on USPS.
+
+# Spoken while the USPS lookup runs
+ADDRESS_VERIFICATION_FILLER = "Thank you. Let me verify that address."
+
+# Fixed questions that nodes speak directly instead of asking the LLM to
+ADDRESS_NOT_VALIDATED_PROMPT = "I'm sorry, but I couldn't validate that address. This might be because the ZIP code doesn't match the city. Let's try again. Please tell me your complete address including street number, street name, city, state, and ZIP code."
+ADDRESS_FORMAT_PROMPT = "I'm sorry, but I couldn't understand the format of your address. Please provide your complete address in this format: street number and name, city, state abbreviation and ZIP code. For example: \"123 Main Street, New York, NY 10001\"."
+PHONE_NUMBER_PROMPT = "What is your phone number? Please include the area code."
+EMAIL_PREFERENCE_PROMPT = "Would you like to provide an email address for appointment confirmations and reminders? This is optional, and you can choose not to provide one if you prefer."
+
+# Phrases the bot speaks word for word, so their audio can be rendered once
+STATIC_TTS_PHRASES = (
+    ADDRESS_VERIFICATION_FILLER,
+    ADDRESS_NOT_VALIDATED_PROMPT,
+    ADDRESS_FORMAT_PROMPT,
+    PHONE_NUMBER_PROMPT,
+    EMAIL_PREFERENCE_PROMPT,
+)
+
+# usaddress tags that make up street line 1, in reading order
+_STREET_TAGS = (
+    "AddressNumberPrefix",
+    "AddressNumber",
+    "AddressNumberSuffix",
+    "StreetNamePreDirectional",
+    "StreetNamePreModifier",
+    "StreetNamePreType",
+    "StreetName",
+    "StreetNamePostType",
+    "StreetNamePostModifier",
+    "StreetNamePostDirectional",
+    "SubaddressType",
+    "SubaddressIdentifier",  # For apt, suite, etc.
+)
+
+
+# "street, city, state ZIP", the form the address prompts ask for
+_ADDRESS_RE = re.compile(
+    r"^\s*(?P<street>\d[^,]*?)\s*,\s*(?P<city>[^,]+?)\s*,\s*"
+    r"(?P<state>[A-Za-z][A-Za-z .]*?)\s*,?\s+(?P<zip>\d{5})(?:-\d{4})?\s*$"
+)
+
+
+def _parse_address(address: str):
+    """
+    Split an address into street line 1, city, state and ZIP.
+
+    Addresses in the usual comma-separated form are matched with a regex.
+    Anything else goes through usaddress's slower CRF tagger.
+
+    Args:
+        address (str): The address as confirmed by the patient.
+
+    Returns:
+        tuple | None: (street, city, state, zip) with None for any part that
+            could not be found, or None if usaddress finds it ambiguous.
+    """
+    match = _ADDRESS_RE.match(address)
+    if match:
+        return match.group("street", "city", "state", "zip")
 
+    # usaddress.tag returns the tagged parts and an 'Ambiguous' type if it fails badly.
+    tagged_address, address_type = usaddress.tag(address)
+    if address_type == "Ambiguous":
+        return None
+
+    # Reconstruct street_address_line1 in the correct order
+    street_address_line1 = " ".join(
+        tagged_address[tag] for tag in _STREET_TAGS if tag in tagged_address
+    )
+    return (
+        street_address_line1,
+        tagged_address.get("PlaceName"),
+        tagged_address.get("StateName"),
+        tagged_address.get("ZipCode"),
+    )
+
+
+async def handle_full_address_confirmation(
+    args: Dict, result: SpellingConfirmationResult, flow_manager: FlowManager
+):
+    """Handle full address confirmation using usaddress parsing."""
+    state = flow_manager.state
     if result.get("confirmed") and not result.get("corrected_spelling"):
-        full_address_str = flow_manager.state.get("full_address", "")
+        full_address_str = state.get("full_address", "")
         logger.info(
-            f"Address confirmed: '{full_address_str}'. Proceeding to parse and validate."
+            "Address confirmed: '{}'. Proceeding to parse and validate.",
+            full_address_str,
         )
     elif result.get("corrected_spelling"):
         if result.get("confirmed", False) and result.get("corrected_spelling"):
             logger.warning(
-                f"LLM set confirmed=true but also provided corrected_address: '{result.get("corrected_spelling")}'. Prioritizing corrected."
+                "LLM set confirmed=true but also provided corrected_address: '{}'. Prioritizing corrected.",
+                result.get("corrected_spelling"),
             )
             full_address_str = result.get("corrected_spelling")
-            flow_manager.state["full_address"] = (
+            state["full_address"] = (
                 full_address_str  # Update state with this correction
             )
         elif not result.get("confirmed") and result.get("corrected_spelling"):
             full_address_str = result.get("corrected_spelling")
-            flow_manager.state["full_address"] = (
-                full_address_str  # Update state with the correction
-            )
+            state["full_address"] = full_address_str  # Update state with the correction
             logger.info(
-                f"Address correction provided: '{full_address_str}'. Looping back to confirm this new address."
+                "Address correction provided: '{}'. Looping back to confirm this new address.",
+                full_address_str,
             )
             # Loop back to confirm the new address
             await flow_manager.set_node(
@@ -743,9 +800,9 @@ async def handle_full_address_confirmation(
             return
 
     else:  # Not confirmed, and no correction given (e.g. user just said "no")
-        current_address = flow_manager.state.get("full_address", "")
+        current_address = state.get("full_address", "")
         logger.info(
-            f"Address not confirmed, no correction. Re-confirming: {current_address}"
+            "Address not confirmed, no correction. Re-confirming: {}", current_address
         )
         await flow_manager.set_node(
             "confirm_full_address",
@@ -763,77 +820,43 @@ async def handle_full_address_confirmation(
         return
 
     try:
-        # Parse the address using usaddress
-        # usaddress.tag returns a list of tuples (value, tag) and an 'Ambiguous' type if it fails badly.
-        parsed_address_dict = {}
-        address_parts = []  # For reconstructing street line 1
+        parsed_address = _parse_address(full_address_str)
 
-        # Use usaddress.repeated_tag for potentially cleaner, structured output
-        tagged_address, address_type = usaddress.tag(full_address_str)
-
-        if address_type == "Ambiguous":
+        if parsed_address is None:
             logger.warning(
-                f"Address '{full_address_str}' is ambiguous according to usaddress."
+                "Address '{}' is ambiguous according to usaddress.", full_address_str
             )
             await flow_manager.set_node(
                 "address_invalid_format", create_address_invalid_format_node()
             )
             return
 
-        # Define components for street address line 1
-        # Order matters for reconstruction. Add more tags if needed.
-        street_tags_ordered = [
-            "AddressNumberPrefix",
-            "AddressNumber",
-            "AddressNumberSuffix",
-            "StreetNamePreDirectional",
-            "StreetNamePreModifier",
-            "StreetNamePreType",
-            "StreetName",
-            "StreetNamePostType",
-            "StreetNamePostModifier",
-            "StreetNamePostDirectional",
-            "SubaddressType",
-            "SubaddressIdentifier",  # For apt, suite, etc.
-        ]
-
-        temp_street_parts = {}  # Use dict to store parts by tag to ensure order later
-
-        for key, value in tagged_address.items():
-            parsed_address_dict[key] = value
-            if key in street_tags_ordered:
-                temp_street_parts[key] = value
-
-        # Reconstruct street_address_line1 in the correct order
-        street_address_line1_parts = [
-            temp_street_parts[tag]
-            for tag in street_tags_ordered
-            if tag in temp_street_parts
-        ]
-        street_address_line1 = " ".join(street_address_line1_parts)
-
-        city_parsed = tagged_address.get("PlaceName")
-        state_full_name_parsed = tagged_address.get("StateName")
-        zip_parsed = tagged_address.get("ZipCode")
+        street_address_line1, city_parsed, state_full_name_parsed, zip_parsed = (
+            parsed_address
+        )
 
         logger.info(
-            f"Parsed address components: Street='{street_address_line1}', City='{city_parsed}', State Name='{state_full_name_parsed}', ZIP='{zip_parsed}'"
+            "Parsed address components: Street='{}', City='{}', State Name='{}', ZIP='{}'",
+            street_address_line1,
+            city_parsed,
+            state_full_name_parsed,
+            zip_parsed,
         )
 
         if not state_full_name_parsed:
-            logger.warning(f"State name not parsed from address: '{full_address_str}'")
+            logger.warning("State name not parsed from address: '{}'", full_address_str)
             await flow_manager.set_node(
                 "address_invalid_format", create_address_invalid_format_node()
             )
             return
 
-        state_abbreviation = state_name_to_abbreviation.get(
-            state_full_name_parsed.lower()
-        )
+        state_abbreviation = _state_abbreviation(state_full_name_parsed)
 
         if not state_abbreviation:
             logger.warning(
-                f"Could not convert state name '{state_full_name_parsed}' to abbreviation. Address: '{full_address_str}'"
+                "Could not convert state name '{}' to abbreviation. Address: '{}'",
+                state_full_name_parsed,
+                full_address_str,
             )
             await flow_manager.set_node(
                 "address_invalid_format", create_address_invalid_format_node()
@@ -841,58 +864,91 @@ async def handle_full_address_confirmation(
             return
 
         logger.info(
-            f"Converted state '{state_full_name_parsed}' to abbreviation '{state_abbreviation}'"
+            "Converted state '{}' to abbreviation '{}'",
+            state_full_name_parsed,
+            state_abbreviation,
         )
 
         if not all(
             [street_address_line1, city_parsed, zip_parsed]
         ):  # state_abbreviation is now checked
             logger.warning(
-                f"Could not parse all required address components from '{full_address_str}'. Missing: street: {not street_address_line1}, city: {not city_parsed}, zip: {not zip_parsed}"
+                "Could not parse all required address components from '{}'. Missing: street: {}, city: {}, zip: {}",
+                full_address_str,
+                not street_address_line1,
+                not city_parsed,
+                not zip_parsed,
             )
             await flow_manager.set_node(
                 "address_invalid_format", create_address_invalid_format_node()
             )
             return
 
-        # Validate address using the new validator
-        # Ensure the arguments match what AddressValidator expects (e.g., street, city, state, zip5)
-        is_valid = await address_validator.validate_address(
-            street1=street_address_line1,
-            city=city_parsed,
-            state=state_abbreviation,  # Use the 2-letter abbreviation
-            zip5=zip_parsed,
-        )
-
-        if is_valid:
-            logger.info(
-                f"Address validated successfully: {street_address_line1}, {city_parsed}, {state_abbreviation} {zip_parsed}"
+        # Cover the USPS round trip with a short filler utterance
+        await flow_manager.task.queue_frame(TTSSpeakFrame(ADDRESS_VERIFICATION_FILLER))
+        # A token refresh is a separate OAuth round trip; keep it out of the
+        # lookup timeout so it does not eat the whole budget.
+        await address_validator.ensure_access_token()
+        try:
+            validation = await asyncio.wait_for(
+                address_validator.validate_address(
+                    street1=street_address_line1,
+                    city=city_parsed,
+                    state=state_abbreviation,  # Use the 2-letter abbreviation
+                    zip5=zip_parsed,
+                ),
+                timeout=ADDRESS_VALIDATION_TIMEOUT_SECS,
             )
-            flow_manager.state["address"] = {
-                "street": street_address_line1,
-                "city": city_parsed,
-                "state": state_abbreviation,  # Store abbreviation
-                "zip_code": zip_parsed,
+        except asyncio.TimeoutError:
+            validation = {
+                "status": "TIMEOUT",
+                "reason": f"No USPS reply within {ADDRESS_VALIDATION_TIMEOUT_SECS}s.",
             }
-            await flow_manager.set_node("collect_phone", create_collect_phone_node())
-        else:
+
+        status = validation["status"]
+        if status in _REJECTED_ADDRESS_STATUSES:
             logger.warning(
-                f"Address validation failed for: {street_address_line1}, {city_parsed}, {state_abbreviation} {zip_parsed}"
+                "Address validation failed for: {}, {}, {} {}",
+                street_address_line1,
+                city_parsed,
+                state_abbreviation,
+                zip_parsed,
             )
             await flow_manager.set_node(
                 "address_invalid_full", create_address_invalid_full_node()
             )
+            return
+
+        if status in _ACCEPTED_ADDRESS_STATUSES:
+            logger.info("Address validated by USPS ({})", status)
+        else:
+            logger.warning(
+                "Address could not be verified ({}: {}); keeping the address the patient confirmed",
+                status,
+                validation.get("reason"),
+            )
+        state["address"] = {
+            "street": street_address_line1,
+            "city": city_parsed,
+            "state": state_abbreviation,  # Store abbreviation
+            "zip_code": zip_parsed,
+        }
+        await flow_manager.set_node("collect_phone", create_collect_phone_node())
 
     except usaddress.RepeatedLabelError as e:
         logger.error(
-            f"Error parsing address with usaddress (RepeatedLabelError): {full_address_str} - {e}"
+            "Error parsing address with usaddress (RepeatedLabelError): {} - {}",
+            full_address_str,
+            e,
         )
         await flow_manager.set_node(
             "address_invalid_format", create_address_invalid_format_node()
         )
     except Exception as e:
         logger.error(
-            f"Unexpected error during address parsing or validation: {e} for address '{full_address_str}'"
+            "Unexpected error during address parsing or validation: {} for address '{}'",
+            e,
+            full_address_str,
         )
         await flow_manager.set_node(
             "address_invalid_format", create_address_invalid_format_node()
@@ -903,9 +959,9 @@ async def handle_restart_full_address(
     args: Dict, result: FlowResult, flow_manager: FlowManager
 ):
     """Restart full address collection."""
-    flow_manager.state.pop("full_address", None)
+    _clear_state(flow_manager, "collect_full_address")
     await flow_manager.set_node(
-        "collect_full_address", create_collect_full_address_node()
+        "collect_full_address", create_collect_full_address_node(section_start=False)
     )
 
 
@@ -954,12 +1010,15 @@ async def handle_email_collection(
         extracted_email = emails_found[0].lower()
         if len(emails_found) > 1:
             logger.warning(
-                f"Multiple emails found during initial collection: {emails_found}. Using first: {extracted_email}"
+                "Multiple emails found during initial collection: {}. Using first: {}",
+                emails_found,
+                extracted_email,
             )
-        logger.info(f"Extracted email via regex during collection: {extracted_email}")
+        logger.info("Extracted email via regex during collection: {}", extracted_email)
     elif raw_email_input:  # No regex match, but there was input
         logger.warning(
-            f"No email pattern found via regex in initial input: '{raw_email_input}'. Using raw input for now."
+            "No email pattern found via regex in initial input: '{}'. Using raw input for now.",
+            raw_email_input,
         )
         extracted_email = (
             raw_email_input  # Fallback to raw input, hoping LLM gave just the email
@@ -986,7 +1045,7 @@ async def handle_email_confirmation(
 
     if user_confirmed and not raw_correction_text:
         # Email confirmed by user, and LLM did not provide any alternative correction text.
-        logger.info(f"Email '{current_email_in_state}' confirmed by user.")
+        logger.info("Email '{}' confirmed by user.", current_email_in_state)
         await flow_manager.set_node(
             "schedule_appointment", create_schedule_appointment_node()
         )
@@ -1005,12 +1064,15 @@ async def handle_email_confirmation(
             ].lower()  # Take the first found email, normalize to lowercase
             if len(emails_found) > 1:
                 logger.warning(
-                    f"Multiple emails found in correction text: '{raw_correction_text}'. Using the first one: {extracted_email}"
+                    "Multiple emails found in correction text: '{}'. Using the first one: {}",
+                    raw_correction_text,
+                    extracted_email,
                 )
 
             flow_manager.state["email"] = extracted_email
             logger.info(
-                f"Email correction extracted via regex: '{extracted_email}'. Looping back to confirm this new email."
+                "Email correction extracted via regex: '{}'. Looping back to confirm this new email.",
+                extracted_email,
             )
             await flow_manager.set_node(
                 "confirm_email", create_confirm_email_node(extracted_email)
@@ -1018,7 +1080,9 @@ async def handle_email_confirmation(
         else:
             # No valid email found in the correction text by regex.
             logger.warning(
-                f"No valid email pattern found in correction text: '{raw_correction_text}'. Asking to re-confirm current email: '{current_email_in_state}'"
+                "No valid email pattern found in correction text: '{}'. Asking to re-confirm current email: '{}'",
+                raw_correction_text,
+                current_email_in_state,
             )
             # Re-trigger confirmation for the current email in state, or a placeholder if none.
             await flow_manager.set_node(
@@ -1031,7 +1095,8 @@ async def handle_email_confirmation(
             )
     else:  # Not confirmed (user_confirmed is False), and no correction text given (e.g., user just said "no")
         logger.info(
-            f"Email spelling not confirmed by user, no correction text offered. Re-confirming current email: '{current_email_in_state}'"
+            "Email spelling not confirmed by user, no correction text offered. Re-confirming current email: '{}'",
+            current_email_in_state,
         )
         await flow_manager.set_node(
             "confirm_email",
@@ -1055,10 +1120,11 @@ async def handle_appointment_selection(
     )
 
     # Store appointment details
-    flow_manager.state["appointment_time"] = selected_time
+    state = flow_manager.state
+    state["appointment_time"] = selected_time
     if selected_appointment:
-        flow_manager.state["doctor_name"] = selected_appointment["doctor"]
-        flow_manager.state["doctor_specialty"] = selected_appointment["specialty"]
+        state["doctor_name"] = selected_appointment["doctor"]
+        state["doctor_specialty"] = selected_appointment["specialty"]
 
     await flow_manager.set_node(
         "confirm_appointment",
@@ -1074,12 +1140,7 @@ async def handle_restart_address(
     args: Dict, result: FlowResult, flow_manager: FlowManager
 ):
     """Restart address collection from house number."""
-    # Clear address-related state
-    flow_manager.state.pop("house_number", None)
-    flow_manager.state.pop("street_name", None)
-    flow_manager.state.pop("city", None)
-    flow_manager.state.pop("state", None)
-    flow_manager.state.pop("zip_code", None)
+    _clear_state(flow_manager, "collect_house_number")
     await flow_manager.set_node(
         "collect_house_number", create_collect_house_number_node()
     )
@@ -1089,14 +1150,15 @@ async def handle_end(args: Dict, result: FlowResult, flow_manager: FlowManager):
     """End the intake process and send confirmation email if applicable."""
 
     # Check if patient provided an email address
-    patient_email = flow_manager.state.get("email")
+    state = flow_manager.state
+    patient_email = state.get("email")
 
     if patient_email:
         # Prepare appointment details for email
         appointment_details = {
-            "doctor": flow_manager.state.get("doctor_name", "N/A"),
-            "time": flow_manager.state.get("appointment_time", "N/A"),
-            "specialty": flow_manager.state.get("doctor_specialty", "N/A"),
+            "doctor": state.get("doctor_name", "N/A"),
+            "time": state.get("appointment_time", "N/A"),
+            "specialty": state.get("doctor_specialty", "N/A"),
         }
 
         # Send confirmation email
@@ -1107,31 +1169,103 @@ async def handle_end(args: Dict, result: FlowResult, flow_manager: FlowManager):
 
             if success:
                 logger.info(
-                    f"Appointment confirmation email sent successfully to {patient_email}"
+                    "Appointment confirmation email sent successfully to {}",
+                    patient_email,
                 )
             else:
                 logger.warning(
-                    f"Failed to send appointment confirmation email to {patient_email}"
+                    "Failed to send appointment confirmation email to {}", patient_email
                 )
 
         except Exception as e:
             logger.error(
-                f"Error sending appointment confirmation email to {patient_email}: {e}"
+                "Error sending appointment confirmation email to {}: {}",
+                patient_email,
+                e,
             )
 
     await flow_manager.set_node("end", create_end_node())
 
 
+# Name and payer spelling confirmations all take the same arguments, so their
+# nodes share one parameter schema.
+_SPELLING_CONFIRMATION_DESCRIPTION = "Call this ONLY after the patient responds to your spelling confirmation question. Set confirmed=true if they agree, or confirmed=false with corrected_spelling if they provide a different spelling."
+_SPELLING_CONFIRMATION_PROPERTIES = {
+    "confirmed": {
+        "type": "boolean",
+        "description": "Whether the patient confirmed the spelling is correct",
+    },
+    "corrected_spelling": {
+        "type": "string",
+        "description": "The corrected spelling if the patient said it was wrong",
+    },
+}
+
+
+def _spelling_confirmation_schema(
+    name: str, handler, transition_callback
+) -> FlowsFunctionSchema:
+    """Build a spelling confirmation function on the shared schema."""
+    return FlowsFunctionSchema(
+        name=name,
+        description=_SPELLING_CONFIRMATION_DESCRIPTION,
+        properties=_SPELLING_CONFIRMATION_PROPERTIES,
+        required=["confirmed"],
+        handler=handler,
+        transition_callback=transition_callback,
+    )
+
+
+# Both invalid-address nodes offer the same restart function; flows only reads
+# schemas, so they share one instance.
+_RESTART_FULL_ADDRESS_SCHEMA = FlowsFunctionSchema(
+    name="restart_address_collection",
+    description="Call this function ONLY AFTER the patient provides their full address again in response to the request for a re-validated address. This function takes no arguments.",
+    properties={},
+    required=[],
+    handler=restart_address_collection,
+    transition_callback=handle_restart_full_address,
+)
+
+
+# Nodes that open a new section of the intake start from a fresh context.
+# Nothing said in earlier sections is needed to ask the next question, so
+# later turns only send the role prompt and the current section's history.
+_SECTION_START = {
+    "role_messages": [{"role": "system", "content": BASE_SYSTEM_PROMPT}],
+    "context_strategy": ContextStrategyConfig(strategy=ContextStrategy.RESET),
+}
+
+
+def _speak_first(text: str) -> dict:
+    """
+    Node settings that speak a fixed question without an LLM turn.
+
+    The question is played by TTS on entry and the LLM only runs once the
+    patient answers.
+
+    Args:
+        text (str): The exact question to speak.
+
+    Returns:
+        dict: Node config entries to merge into the node.
+    """
+    return {
+        "pre_actions": [{"type": "tts_say", "text": text}],
+        "respond_immediately": False,
+    }
+
+
 # Node configurations
+#
+# Handlers rebuild a node on every transition. FlowManager only reads node
+# configs, so factories built purely from static data cache what they return.
+# Nodes that embed what the patient said are built fresh each time so no
+# patient data outlives the call in a process-wide cache.
 def create_initial_node() -> NodeConfig:
     """Create initial node for first name collection."""
     return {
-        "role_messages": [
-            {
-                "role": "system",
-                "content": "You are a friendly medical intake assistant. Your responses will be converted to audio, so avoid special characters and emojis. IMPORTANT: You must first ASK questions and wait for the user to respond before calling any functions. Never call a function with your own question as the parameter value.",
-            }
-        ],
+        "role_messages": [{"role": "system", "content": BASE_SYSTEM_PROMPT}],
         "task_messages": [
             {
                 "role": "system",
@@ -1158,8 +1292,7 @@ def create_initial_node() -> NodeConfig:
 
 def create_confirm_first_name_node(name: str) -> NodeConfig:
     """Create node for confirming first name spelling."""
-    # Convert name to spaced letters format
-    spaced_name = " ".join(name.upper())
+    spaced_name = spell_out(name)
     return {
         "task_messages": [
             {
@@ -1168,27 +1301,16 @@ def create_confirm_first_name_node(name: str) -> NodeConfig:
             }
         ],
         "functions": [
-            FlowsFunctionSchema(
-                name="confirm_first_name_spelling",
-                description="Call this ONLY after the patient responds to your spelling confirmation question. Set confirmed=true if they agree, or confirmed=false with corrected_spelling if they provide a different spelling.",
-                properties={
-                    "confirmed": {
-                        "type": "boolean",
-                        "description": "Whether the patient confirmed the spelling is correct",
-                    },
-                    "corrected_spelling": {
-                        "type": "string",
-                        "description": "The corrected spelling if the patient said it was wrong",
-                    },
-                },
-                required=["confirmed"],
-                handler=confirm_first_name_spelling,
-                transition_callback=handle_first_name_confirmation,
+            _spelling_confirmation_schema(
+                "confirm_first_name_spelling",
+                confirm_first_name_spelling,
+                handle_first_name_confirmation,
             )
         ],
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_last_name_node() -> NodeConfig:
     """Create node for last name collection."""
     return {
@@ -1218,8 +1340,7 @@ def create_collect_last_name_node() -> NodeConfig:
 
 def create_confirm_last_name_node(name: str) -> NodeConfig:
     """Create node for confirming last name spelling."""
-    # Convert name to spaced letters format
-    spaced_name = " ".join(name.upper())
+    spaced_name = spell_out(name)
     return {
         "task_messages": [
             {
@@ -1228,30 +1349,20 @@ def create_confirm_last_name_node(name: str) -> NodeConfig:
             }
         ],
         "functions": [
-            FlowsFunctionSchema(
-                name="confirm_last_name_spelling",
-                description="Call this ONLY after the patient responds to your spelling confirmation question. Set confirmed=true if they agree, or confirmed=false with corrected_spelling if they provide a different spelling.",
-                properties={
-                    "confirmed": {
-                        "type": "boolean",
-                        "description": "Whether the patient confirmed the spelling is correct",
-                    },
-                    "corrected_spelling": {
-                        "type": "string",
-                        "description": "The corrected spelling if the patient said it was wrong",
-                    },
-                },
-                required=["confirmed"],
-                handler=confirm_last_name_spelling,
-                transition_callback=handle_last_name_confirmation,
+            _spelling_confirmation_schema(
+                "confirm_last_name_spelling",
+                confirm_last_name_spelling,
+                handle_last_name_confirmation,
             )
         ],
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_payer_name_node() -> NodeConfig:
     """Create node for payer name collection."""
     return {
+        **_SECTION_START,
         "task_messages": [
             {
                 "role": "system",
@@ -1278,8 +1389,7 @@ def create_collect_payer_name_node() -> NodeConfig:
 
 def create_confirm_payer_name_node(name: str) -> NodeConfig:
     """Create node for confirming payer name spelling."""
-    # Convert name to spaced letters format
-    spaced_name = " ".join(name.upper())
+    spaced_name = spell_out(name)
     return {
         "task_messages": [
             {
@@ -1288,27 +1398,16 @@ def create_confirm_payer_name_node(name: str) -> NodeConfig:
             }
         ],
         "functions": [
-            FlowsFunctionSchema(
-                name="confirm_payer_spelling",
-                description="Call this ONLY after the patient responds to your spelling confirmation question. Set confirmed=true if they agree, or confirmed=false with corrected_spelling if they provide a different spelling.",
-                properties={
-                    "confirmed": {
-                        "type": "boolean",
-                        "description": "Whether the patient confirmed the spelling is correct",
-                    },
-                    "corrected_spelling": {
-                        "type": "string",
-                        "description": "The corrected spelling if the patient said it was wrong",
-                    },
-                },
-                required=["confirmed"],
-                handler=confirm_payer_spelling,
-                transition_callback=handle_payer_name_confirmation,
+            _spelling_confirmation_schema(
+                "confirm_payer_spelling",
+                confirm_payer_spelling,
+                handle_payer_name_confirmation,
             )
         ],
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_payer_id_node() -> NodeConfig:
     """Create node for payer ID collection."""
     return {
@@ -1369,9 +1468,11 @@ def create_confirm_payer_id_node(payer_id: int) -> NodeConfig:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_check_referral_node() -> NodeConfig:
     """Create node for checking referral status."""
     return {
+        **_SECTION_START,
         "task_messages": [
             {
                 "role": "system",
@@ -1396,6 +1497,7 @@ def create_check_referral_node() -> NodeConfig:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_physician_first_name_node() -> NodeConfig:
     """Create node for physician first name collection."""
     return {
@@ -1420,8 +1522,7 @@ def create_collect_physician_first_name_node() -> NodeConfig:
 
 def create_confirm_physician_first_name_node(name: str) -> NodeConfig:
     """Create node for confirming physician first name spelling."""
-    # Convert name to spaced letters format
-    spaced_name = " ".join(name.upper())
+    spaced_name = spell_out(name)
     return {
         "task_messages": [
             {
@@ -1430,27 +1531,16 @@ def create_confirm_physician_first_name_node(name: str) -> NodeConfig:
             }
         ],
         "functions": [
-            FlowsFunctionSchema(
-                name="confirm_physician_first_name_spelling",
-                description="Call this ONLY after the patient responds to your spelling confirmation question. Set confirmed=true if they agree, or confirmed=false with corrected_spelling if they provide a different spelling.",
-                properties={
-                    "confirmed": {
-                        "type": "boolean",
-                        "description": "Whether the patient confirmed the spelling is correct",
-                    },
-                    "corrected_spelling": {
-                        "type": "string",
-                        "description": "The corrected spelling if the patient said it was wrong",
-                    },
-                },
-                required=["confirmed"],
-                handler=confirm_physician_first_name_spelling,
-                transition_callback=handle_physician_first_name_confirmation,
+            _spelling_confirmation_schema(
+                "confirm_physician_first_name_spelling",
+                confirm_physician_first_name_spelling,
+                handle_physician_first_name_confirmation,
             )
         ],
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_physician_last_name_node() -> NodeConfig:
     """Create node for physician last name collection."""
     return {
@@ -1475,8 +1565,7 @@ def create_collect_physician_last_name_node() -> NodeConfig:
 
 def create_confirm_physician_last_name_node(name: str) -> NodeConfig:
     """Create node for confirming physician last name spelling."""
-    # Convert name to spaced letters format
-    spaced_name = " ".join(name.upper())
+    spaced_name = spell_out(name)
     return {
         "task_messages": [
             {
@@ -1485,30 +1574,20 @@ def create_confirm_physician_last_name_node(name: str) -> NodeConfig:
             }
         ],
         "functions": [
-            FlowsFunctionSchema(
-                name="confirm_physician_last_name_spelling",
-                description="Call this ONLY after the patient responds to your spelling confirmation question. Set confirmed=true if they agree, or confirmed=false with corrected_spelling if they provide a different spelling.",
-                properties={
-                    "confirmed": {
-                        "type": "boolean",
-                        "description": "Whether the patient confirmed the spelling is correct",
-                    },
-                    "corrected_spelling": {
-                        "type": "string",
-                        "description": "The corrected spelling if the patient said it was wrong",
-                    },
-                },
-                required=["confirmed"],
-                handler=confirm_physician_last_name_spelling,
-                transition_callback=handle_physician_last_name_confirmation,
+            _spelling_confirmation_schema(
+                "confirm_physician_last_name_spelling",
+                confirm_physician_last_name_spelling,
+                handle_physician_last_name_confirmation,
             )
         ],
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_complaint_node() -> NodeConfig:
     """Create node for collecting chief medical complaint."""
     return {
+        **_SECTION_START,
         "task_messages": [
             {
                 "role": "system",
@@ -1533,9 +1612,21 @@ def create_collect_complaint_node() -> NodeConfig:
     }
 
 
-def create_collect_full_address_node() -> NodeConfig:
-    """Create node for collecting full address."""
+@functools.lru_cache(maxsize=2)
+def create_collect_full_address_node(section_start: bool = True) -> NodeConfig:
+    """
+    Create node for collecting full address.
+
+    Args:
+        section_start (bool): Reset the context on entry. Retries from the
+            invalid-address nodes pass False so the address the patient just
+            repeated stays in context.
+
+    Returns:
+        NodeConfig: The node configuration.
+    """
     return {
+        **(_SECTION_START if section_start else {}),
         "task_messages": [
             {
                 "role": "system",
@@ -1593,50 +1684,37 @@ def create_confirm_full_address_node(address: str) -> NodeConfig:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_address_invalid_full_node() -> NodeConfig:
     """Create node for invalid address after full address collection."""
     return {
+        **_speak_first(ADDRESS_NOT_VALIDATED_PROMPT),
         "task_messages": [
             {
                 "role": "system",
-                "content": "I'm sorry, but I couldn't validate that address. This might be because the ZIP code doesn't match the city. You MUST say this and ask the patient to provide their address again. Say EXACTLY: 'I'm sorry, but I couldn't validate that address. This might be because the ZIP code doesn't match the city. Let's try again. Please tell me your complete address including street number, street name, city, state, and ZIP code.' Do NOT call any function yet - wait for their response. You should expect the user to provide their full address. Once they do, call the `restart_address_collection` function. Do not pass any arguments to it.",
+                "content": f"You have just told the patient: '{ADDRESS_NOT_VALIDATED_PROMPT}' Do NOT repeat it. Do NOT call any function yet - wait for their response. You should expect the user to provide their full address. Once they do, call the `restart_address_collection` function. Do not pass any arguments to it.",
             }
         ],
-        "functions": [
-            FlowsFunctionSchema(
-                name="restart_address_collection",
-                description="Call this function ONLY AFTER the patient provides their full address again in response to the request for a re-validated address. This function takes no arguments.",
-                properties={},
-                required=[],
-                handler=restart_address_collection,
-                transition_callback=handle_restart_full_address,
-            )
-        ],
+        "functions": [_RESTART_FULL_ADDRESS_SCHEMA],
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_address_invalid_format_node() -> NodeConfig:
     """Create node for invalid address format."""
     return {
+        **_speak_first(ADDRESS_FORMAT_PROMPT),
         "task_messages": [
             {
                 "role": "system",
-                "content": "I'm sorry, but I couldn't understand the format of your address. You MUST say this and ask the patient to provide their address again. Say EXACTLY: 'I'm sorry, but I couldn't understand the format of your address. Please provide your complete address in this format: street number and name, city, state abbreviation and ZIP code. For example: \"123 Main Street, New York, NY 10001\".' Do NOT call any function yet - wait for their response. You should expect the user to provide their full address. Once they do, call the `restart_address_collection` function. Do not pass any arguments to it.",
+                "content": f"You have just told the patient: '{ADDRESS_FORMAT_PROMPT}' Do NOT repeat it. Do NOT call any function yet - wait for their response. You should expect the user to provide their full address. Once they do, call the `restart_address_collection` function. Do not pass any arguments to it.",
             }
         ],
-        "functions": [
-            FlowsFunctionSchema(
-                name="restart_address_collection",
-                description="Call this function ONLY AFTER the patient provides their full address again in response to the request for a re-validated address. This function takes no arguments.",
-                properties={},
-                required=[],
-                handler=restart_address_collection,
-                transition_callback=handle_restart_full_address,
-            )
-        ],
+        "functions": [_RESTART_FULL_ADDRESS_SCHEMA],
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_address_invalid_node() -> NodeConfig:
     """Create node for invalid address handling."""
     return {
@@ -1659,13 +1737,16 @@ def create_address_invalid_node() -> NodeConfig:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_phone_node() -> NodeConfig:
     """Create node for phone collection."""
     return {
+        **_SECTION_START,
+        **_speak_first(PHONE_NUMBER_PROMPT),
         "task_messages": [
             {
                 "role": "system",
-                "content": "Your first task is to ask for the patient's phone number. Say EXACTLY: 'What is your phone number? Please include the area code.' Do NOT call any function yet. You MUST wait for the patient to provide their phone number. Only AFTER the patient speaks their phone number, should you call the 'collect_phone' function with the number they provided.",
+                "content": f"You have just asked the patient: '{PHONE_NUMBER_PROMPT}' Do NOT repeat the question. Do NOT call any function yet. You MUST wait for the patient to provide their phone number. Only AFTER the patient speaks their phone number, should you call the 'collect_phone' function with the number they provided.",
             }
         ],
         "functions": [
@@ -1681,13 +1762,15 @@ def create_collect_phone_node() -> NodeConfig:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_ask_email_preference_node() -> NodeConfig:
     """Create node for asking email preference."""
     return {
+        **_speak_first(EMAIL_PREFERENCE_PROMPT),
         "task_messages": [
             {
                 "role": "system",
-                "content": "Your task is to ask the patient if they want to provide an email. Say EXACTLY: 'Would you like to provide an email address for appointment confirmations and reminders? This is optional, and you can choose not to provide one if you prefer.' Do NOT call any function yet. You MUST wait for the patient to respond with 'yes' or 'no'. Only AFTER the patient responds, call the 'ask_email_preference' function with their choice (true for yes, false for no).",
+                "content": f"You have just asked the patient: '{EMAIL_PREFERENCE_PROMPT}' Do NOT repeat the question. Do NOT call any function yet. You MUST wait for the patient to respond with 'yes' or 'no'. Only AFTER the patient responds, call the 'ask_email_preference' function with their choice (true for yes, false for no).",
             }
         ],
         "functions": [
@@ -1708,6 +1791,7 @@ def create_ask_email_preference_node() -> NodeConfig:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_collect_email_node() -> NodeConfig:
     """Create node for email collection."""
     return {
@@ -1829,22 +1913,16 @@ def create_confirm_email_node(email: str) -> NodeConfig:
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_schedule_appointment_node() -> NodeConfig:
     """Create node for appointment scheduling."""
-    # Format appointments with doctor information
-    available_times_str = "\\n".join(
-        [
-            f"- {apt['time']} with {apt['doctor']} ({apt['specialty']})"
-            for apt in AVAILABLE_APPOINTMENTS
-        ]
-    )
     return {
         "task_messages": [
             {
                 "role": "system",
                 "content": f"""Your task is to offer the patient available appointment times and then record their choice.
 First, you MUST say EXACTLY: 'Here are the available appointment times:
-{available_times_str}
+{AVAILABLE_APPOINTMENTS_LISTING}
 
 Which time works best for you?'
 Make sure to include the doctor name and specialty for each time slot.
@@ -1867,6 +1945,7 @@ Only after the patient tells you their preferred time, you should call the 'sele
     }
 
 
+@functools.lru_cache(maxsize=32)
 def create_confirm_appointment_node(
     selected_time: str, doctor_name: str = None, doctor_specialty: str = None
 ) -> NodeConfig:
@@ -1905,6 +1984,7 @@ If they ask a question, answer it briefly if you can, and then call 'end_intake'
     }
 
 
+@functools.lru_cache(maxsize=1)
 def create_end_node() -> NodeConfig:
     """Create the final node."""
     return {
@@ -1919,6 +1999,45 @@ def create_end_node() -> NodeConfig:
     }
 
 
+# Name confirmation transitions, built here because they need the node
+# factories above
+handle_first_name_confirmation = _make_spelling_confirmation_transition(
+    "first_name",
+    "confirm_first_name",
+    create_confirm_first_name_node,
+    "collect_last_name",
+    create_collect_last_name_node,
+)
+handle_last_name_confirmation = _make_spelling_confirmation_transition(
+    "last_name",
+    "confirm_last_name",
+    create_confirm_last_name_node,
+    "collect_payer_name",
+    create_collect_payer_name_node,
+)
+handle_payer_name_confirmation = _make_spelling_confirmation_transition(
+    "payer_name",
+    "confirm_payer_name",
+    create_confirm_payer_name_node,
+    "collect_payer_id",
+    create_collect_payer_id_node,
+)
+handle_physician_first_name_confirmation = _make_spelling_confirmation_transition(
+    "physician_first_name",
+    "confirm_physician_first_name",
+    create_confirm_physician_first_name_node,
+    "collect_physician_last_name",
+    create_collect_physician_last_name_node,
+)
+handle_physician_last_name_confirmation = _make_spelling_confirmation_transition(
+    "physician_last_name",
+    "confirm_physician_last_name",
+    create_confirm_physician_last_name_node,
+    "collect_complaint",
+    create_collect_complaint_node,
+)
+
+
 # Complete flow configuration
 flow_config = {
     "initial_node": "initial",  # This should be a string key, not the actual node
@@ -1969,3 +2088,38 @@ flow_config = {
         "end": create_end_node(),
     },
 }
+
+
+def _compile_flow_config(config: dict) -> MappingProxyType:
+    """
+    Validate the static flow graph once and intern its node names.
+
+    FlowManager stores the config as-is, so a broken graph would otherwise only
+    surface mid-call. Doing the checks at import keeps them off the call path.
+
+    Args:
+        config (dict): The flow configuration to compile.
+
+    Returns:
+        MappingProxyType: A read-only config with the same nodes keyed by
+            interned names.
+    """
+    nodes = {sys.intern(name): node for name, node in config["nodes"].items()}
+    initial_node = sys.intern(config["initial_node"])
+    if initial_node not in nodes:
+        raise ValueError(f"Initial node '{initial_node}' is not in the flow config")
+
+    for name, node in nodes.items():
+        function_names = [function.name for function in node.get("functions", [])]
+        if len(function_names) != len(set(function_names)):
+            raise ValueError(f"Node '{name}' defines duplicate function names")
+        if not node.get("task_messages"):
+            raise ValueError(f"Node '{name}' has no task messages")
+
+    # Shared by every call's FlowManager, so make it read-only
+    return MappingProxyType(
+        {"initial_node": initial_node, "nodes": MappingProxyType(nodes)}
+    )
+
+
+COMPILED_FLOW_CONFIG = _compile_flow_config(flow_config)
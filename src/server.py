@@ -4,7 +4,9 @@ import os
 import xml  # Added import
 
 import uvicorn
-from .bot import run_bot
+from loguru import logger
+from .bot import run_bot, warmup
+from .uvicorn_worker import WEBSOCKET_SETTINGS
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import HTMLResponse
@@ -24,9 +26,14 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATE_DIR = os.path.join(SCRIPT_DIR, "..", "templates")
 
 
+@app.on_event("startup")
+async def startup():
+    await warmup()
+
+
 @app.post("/")
 async def start_call():
-    print("POST TwiML")
+    logger.debug("POST TwiML")
     # Adjusted path for templates
     streams_xml_path = os.path.join(TEMPLATE_DIR, "streams.xml")
     with open(streams_xml_path) as f:
@@ -41,10 +48,10 @@ async def websocket_endpoint(websocket: WebSocket):
     start_data = websocket.iter_text()
     await start_data.__anext__()
     call_data = json.loads(await start_data.__anext__())
-    print(call_data, flush=True)
+    logger.debug("Twilio start message: {}", call_data)
     stream_sid = call_data["start"]["streamSid"]
     call_sid = call_data["start"]["callSid"]
-    print("WebSocket connection accepted")
+    logger.info("WebSocket connection accepted")
     await run_bot(websocket, stream_sid, call_sid)
 
 
@@ -63,4 +70,4 @@ if __name__ == "__main__":
 
     app.state.testing = args.test
 
-    uvicorn.run(app, host="0.0.0.0", port=8765)
+    uvicorn.run(app, host="0.0.0.0", port=8765, loop="uvloop", **WEBSOCKET_SETTINGS)
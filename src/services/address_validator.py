@@ -2,6 +2,7 @@ import os
 import time
 import asyncio
 import aiohttp
+from collections import OrderedDict
 from typing import Dict, Optional, Any
 from dotenv import load_dotenv
 from loguru import logger
@@ -9,10 +10,25 @@ from loguru import logger
 # Load environment variables
 load_dotenv(override=True)
 
+# Validation results are patient addresses, so the cache only has to cover
+# a patient re-confirming within one call. Entries are held for at most
+# VALIDATION_CACHE_TTL_SECS and dropped on the first lookup after that.
+VALIDATION_CACHE_SIZE = 64
+VALIDATION_CACHE_TTL_SECS = 10 * 60
+
+# Statuses that reflect the address itself, not a failed request
+_CACHEABLE_STATUSES = frozenset(
+    {"VALID", "VALID_WITH_CHANGES", "VALID_WITH_ISSUES", "INVALID"}
+)
+
 
 class AddressValidator:
     """
     A class to validate addresses using the USPS API v3 with OAuth 2.0.
+
+    Definitive results are cached in memory, keyed by the normalized address,
+    for at most VALIDATION_CACHE_TTL_SECS (ten minutes) and at most
+    VALIDATION_CACHE_SIZE entries. Nothing is written to disk.
     """
 
     def __init__(
@@ -55,15 +71,26 @@ class AddressValidator:
         self._token_expires_at: float = 0
         self._session: Optional[aiohttp.ClientSession] = None
         self._lock = asyncio.Lock()  # To prevent multiple token fetches concurrently
+        # Normalized address -> (expiry on the monotonic clock, result)
+        self._validation_cache: OrderedDict[tuple, tuple] = OrderedDict()
 
         logger.info(
-            f"AddressValidator initialized. Using {'Test' if self.use_test_env else 'Production'} USPS API environment."
+            "AddressValidator initialized. Using {} USPS API environment.",
+            "Test" if self.use_test_env else "Production",
         )
 
     async def _get_http_session(self) -> aiohttp.ClientSession:
-        """Initializes and returns an aiohttp.ClientSession."""
+        """
+        Initializes and returns an aiohttp.ClientSession.
+
+        The validator is shared by every call in the process, so the session
+        keeps its USPS connections alive between calls and bounds each request.
+        """
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=20, keepalive_timeout=300),
+                timeout=aiohttp.ClientTimeout(sock_connect=0.5, sock_read=1.5),
+            )
         return self._session
 
     async def _get_access_token(self) -> Optional[str]:
@@ -98,7 +125,8 @@ class AddressValidator:
                             time.time() + expires_in - 60
                         )  # Subtract 1 min buffer
                         logger.info(
-                            f"Successfully obtained new access token. Expires in {expires_in}s."
+                            "Successfully obtained new access token. Expires in {}s.",
+                            expires_in,
                         )
                         return self._access_token
                     else:
@@ -108,22 +136,36 @@ class AddressValidator:
                             or str(response_data)
                         )
                         logger.error(
-                            f"Failed to obtain access token. Status: {response.status}, Response: {error_detail}"
+                            "Failed to obtain access token. Status: {}, Response: {}",
+                            response.status,
+                            error_detail,
                         )
                         self._access_token = None
                         self._token_expires_at = 0
                         return None
             except aiohttp.ClientError as e:
-                logger.error(f"HTTP client error during token fetch: {e}")
+                logger.error("HTTP client error during token fetch: {}", e)
                 self._access_token = None
                 self._token_expires_at = 0
                 return None
             except Exception as e:
-                logger.error(f"Unexpected error during token fetch: {e}")
+                logger.error("Unexpected error during token fetch: {}", e)
                 self._access_token = None
                 self._token_expires_at = 0
                 return None
 
+    async def ensure_access_token(self) -> bool:
+        """
+        Fetch an access token now unless a valid one is already cached.
+
+        Lets callers pay for the OAuth round trip outside of a lookup's time
+        budget, e.g. at worker start-up.
+
+        Returns:
+            bool: Whether a valid token is available.
+        """
+        return await self._get_access_token() is not None
+
     async def validate_address(
         self,
         street1: str,
@@ -146,12 +188,60 @@ class AddressValidator:
 
         Returns:
             Dict[str, Any]: Validation result containing:
-                - 'status': "VALID", "VALID_WITH_CHANGES", "INVALID", "AMBIGUOUS",
-                            "VALID_WITH_ISSUES", "API_ERROR", "ERROR".
+                - 'status': "VALID", "VALID_WITH_CHANGES", "VALID_WITH_ISSUES",
+                            "INVALID", "UNKNOWN_DPV", "API_ERROR", "ERROR".
                 - 'reason': A descriptive message.
                 - 'validated_address': Standardized address if considered valid/correctable, else None.
                                      Keys: 'street1', 'street2', 'city', 'state', 'zip5', 'zip4'.
         """
+        # A caller retrying the same address gets the earlier answer without
+        # another USPS round trip
+        cache_key = (
+            street1.strip().casefold(),
+            (street2 or "").strip().casefold(),
+            city.strip().casefold(),
+            state.strip().upper(),
+            zip5.strip(),
+            (zip4 or "").strip(),
+        )
+        # Entries stay in insertion order, which is also expiry order, so
+        # everything past its TTL sits at the front
+        now = time.monotonic()
+        while self._validation_cache:
+            oldest_key = next(iter(self._validation_cache))
+            if self._validation_cache[oldest_key][0] > now:
+                break
+            del self._validation_cache[oldest_key]
+
+        cached = self._validation_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Using cached address validation")
+            return cached[1]
+
+        result = await self._request_validation(
+            street1, city, state, zip5, street2, zip4
+        )
+        if result["status"] in _CACHEABLE_STATUSES:
+            # Re-inserting moves the key to the back, keeping expiry order
+            self._validation_cache.pop(cache_key, None)
+            self._validation_cache[cache_key] = (
+                time.monotonic() + VALIDATION_CACHE_TTL_SECS,
+                result,
+            )
+            if len(self._validation_cache) > VALIDATION_CACHE_SIZE:
+                self._validation_cache.popitem(last=False)
+        return result
+
+    async def _request_validation(
+        self,
+        street1: str,
+        city: str,
+        state: str,
+        zip5: str,
+        street2: Optional[str],
+        zip4: Optional[str],
+    ) -> Dict[str, Any]:
+        """Send one address validation request to USPS and interpret the reply."""
         access_token = await self._get_access_token()
         if not access_token:
             return {
@@ -180,13 +270,13 @@ class AddressValidator:
         }
 
         try:
-            logger.info(f"Sending address validation request to USPS: {params}")
+            logger.debug("Sending address validation request to USPS: {}", params)
             async with session.get(
                 self.address_api_url, params=params, headers=headers
             ) as response:
                 if response.status == 200:
                     data = await response.json()
-                    logger.info(f"USPS Address API response: {data}")
+                    logger.debug("USPS Address API response: {}", data)
 
                     # Default to input if not found in response or response is minimal
                     addr_info = data.get("address", {})
@@ -319,7 +409,9 @@ class AddressValidator:
                         for err in error_data.get("errors", [])
                     ]
                     logger.warning(
-                        f"USPS Address API Bad Request (400): {error_messages}. Input: {params}"
+                        "USPS Address API Bad Request (400): {}. Input: {}",
+                        error_messages,
+                        params,
                     )
                     return {
                         "status": "INVALID",  # Treat as invalid if API says bad request for address
@@ -333,7 +425,7 @@ class AddressValidator:
                     }
                 elif response.status == 401:  # Unauthorized - token issue
                     logger.error(
-                        f"USPS Address API Unauthorized (401). Token might be invalid or expired."
+                        "USPS Address API Unauthorized (401). Token might be invalid or expired."
                     )
                     self._access_token = None  # Force token refresh on next call
                     self._token_expires_at = 0
@@ -345,7 +437,9 @@ class AddressValidator:
                 else:
                     error_text = await response.text()
                     logger.error(
-                        f"USPS Address API request failed. Status: {response.status}, Response: {error_text}"
+                        "USPS Address API request failed. Status: {}, Response: {}",
+                        response.status,
+                        error_text,
                     )
                     return {
                         "status": "API_ERROR",
@@ -353,14 +447,14 @@ class AddressValidator:
                         "validated_address": None,
                     }
         except aiohttp.ClientError as e:
-            logger.error(f"HTTP client error during address validation: {e}")
+            logger.error("HTTP client error during address validation: {}", e)
             return {
                 "status": "API_ERROR",
                 "reason": f"Network error during address validation: {e}",
                 "validated_address": None,
             }
         except Exception as e:
-            logger.error(f"Unexpected error during address validation: {e}")
+            logger.error("Unexpected error during address validation: {}", e)
             return {
                 "status": "ERROR",
                 "reason": f"An unexpected error occurred: {e}",
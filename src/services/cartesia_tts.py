@@ -0,0 +1,102 @@
+from typing import AsyncGenerator, Dict, Iterable, Tuple
+
+from cartesia import AsyncCartesia
+from loguru import logger
+from pipecat.frames.frames import (
+    Frame,
+    TTSAudioRawFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    TTSTextFrame,
+)
+from pipecat.services.cartesia.tts import CartesiaTTSService
+
+# Raw audio for fixed phrases, keyed by the exact text spoken and the voice
+# and output format it was rendered with.
+_PRERENDERED_AUDIO: Dict[Tuple, bytes] = {}
+
+
+def _prerender_key(text: str, model: str, voice_id: str, output_format: Dict) -> Tuple:
+    return (
+        text,
+        model,
+        voice_id,
+        output_format["container"],
+        output_format["encoding"],
+        output_format["sample_rate"],
+    )
+
+
+async def prerender_phrases(
+    phrases: Iterable[str],
+    *,
+    api_key: str,
+    voice_id: str,
+    model: str,
+    output_format: Dict,
+):
+    """
+    Synthesize fixed phrases once and keep their audio for every later call.
+
+    A phrase that fails to render is left out and spoken live instead.
+
+    Args:
+        phrases (Iterable[str]): The exact texts to synthesize.
+        api_key (str): Cartesia API key.
+        voice_id (str): Voice the live TTS service uses.
+        model (str): Cartesia model the live TTS service uses.
+        output_format (Dict): Container, encoding and sample rate the live TTS
+            service uses.
+    """
+    client = AsyncCartesia(api_key=api_key)
+    try:
+        for phrase in phrases:
+            key = _prerender_key(phrase, model, voice_id, output_format)
+            if key in _PRERENDERED_AUDIO:
+                continue
+            try:
+                chunks = [
+                    chunk
+                    async for chunk in client.tts.bytes(
+                        model_id=model,
+                        transcript=phrase,
+                        voice={"mode": "id", "id": voice_id},
+                        output_format=output_format,
+                        language="en",
+                    )
+                ]
+                _PRERENDERED_AUDIO[key] = b"".join(chunks)
+            except Exception as e:
+                logger.warning("Could not prerender '{}': {}", phrase, e)
+    finally:
+        await client.close()
+    logger.info("Prerendered {} TTS phrases", len(_PRERENDERED_AUDIO))
+
+
+class PrerenderedCartesiaTTSService(CartesiaTTSService):
+    """
+    CartesiaTTSService that plays prerendered audio for known phrases.
+
+    Any other text, and any phrase rendered with a different voice, model or
+    output format, is synthesized live as usual.
+    """
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        audio = _PRERENDERED_AUDIO.get(
+            _prerender_key(
+                text, self.model_name, self._voice_id, self._settings["output_format"]
+            )
+        )
+        # Live audio plays out of Cartesia's audio-context queue. Pushing a
+        # cached phrase while a context is open or queued would interleave it
+        # with that audio, so only short-circuit when the queue is idle.
+        if audio is None or self._context_id or self._contexts:
+            async for frame in super().run_tts(text):
+                yield frame
+            return
+
+        logger.debug("{}: Playing prerendered TTS [{}]", self, text)
+        yield TTSStartedFrame()
+        yield TTSAudioRawFrame(audio=audio, sample_rate=self.sample_rate, num_channels=1)
+        yield TTSTextFrame(text)
+        yield TTSStoppedFrame()
@@ -0,0 +1,63 @@
+from typing import List
+
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+# Enough for several flow nodes' worth of questions, answers and tool calls.
+DEFAULT_MAX_MESSAGES = 40
+# How many recent messages survive a trim.
+DEFAULT_KEEP_MESSAGES = 24
+
+
+class WindowedOpenAILLMContext(OpenAILLMContext):
+    """
+    OpenAILLMContext that only keeps the most recent conversation messages.
+
+    The leading system messages (the role prompt and first task) are pinned.
+    Everything after them is capped at `max_messages`, so the payload sent on
+    each LLM turn stops growing with the length of the call.
+
+    Trimming drops back to `keep_messages` in one step instead of sliding by
+    one message per turn. Between trims the context is append-only, so OpenAI's
+    prompt cache keeps hitting on the whole history, not just the pinned part.
+    """
+
+    def __init__(
+        self,
+        *args,
+        max_messages: int = DEFAULT_MAX_MESSAGES,
+        keep_messages: int = DEFAULT_KEEP_MESSAGES,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        self._max_messages = max_messages
+        self._keep_messages = min(keep_messages, max_messages)
+        self._trim()
+
+    def add_message(self, message):
+        super().add_message(message)
+        self._trim()
+
+    def add_messages(self, messages: List):
+        super().add_messages(messages)
+        self._trim()
+
+    def set_messages(self, messages: List):
+        super().set_messages(messages)
+        self._trim()
+
+    def _trim(self):
+        pinned = 0
+        while pinned < len(self._messages) and self._messages[pinned].get("role") == "system":
+            pinned += 1
+
+        if len(self._messages) - pinned <= self._max_messages:
+            return
+
+        cut = len(self._messages) - self._keep_messages
+
+        # A tool result is only valid right after the assistant message that
+        # requested it, so never let the window start on an orphaned one.
+        while cut < len(self._messages) and self._messages[cut].get("role") == "tool":
+            cut += 1
+
+        del self._messages[pinned:cut]
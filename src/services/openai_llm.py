@@ -0,0 +1,58 @@
+import functools
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from pipecat.services.openai.llm import OpenAILLMService
+
+
+@functools.lru_cache(maxsize=None)
+def get_shared_openai_client(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    organization: Optional[str] = None,
+    project: Optional[str] = None,
+) -> AsyncOpenAI:
+    """
+    Return a process-wide AsyncOpenAI client for the given credentials.
+
+    The client keeps its connections alive between calls, so only the first
+    call in a worker pays for the TCP and TLS handshakes.
+    """
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        organization=organization,
+        project=project,
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_keepalive_connections=100,
+                max_connections=1000,
+                keepalive_expiry=None,
+            )
+        ),
+    )
+
+
+class SharedClientOpenAILLMService(OpenAILLMService):
+    """OpenAILLMService that reuses the shared AsyncOpenAI client."""
+
+    def create_client(
+        self,
+        api_key=None,
+        base_url=None,
+        organization=None,
+        project=None,
+        default_headers=None,
+        **kwargs,
+    ):
+        if default_headers or kwargs:
+            return super().create_client(
+                api_key=api_key,
+                base_url=base_url,
+                organization=organization,
+                project=project,
+                default_headers=default_headers,
+                **kwargs,
+            )
+        return get_shared_openai_client(api_key, base_url, organization, project)
@@ -0,0 +1,239 @@
+import functools
+import os
+import tempfile
+from importlib.resources import files
+from typing import Optional
+
+import numpy as np
+import onnxruntime as ort
+from loguru import logger
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+MODELS_DIR = os.path.join(PROJECT_ROOT, "models")
+
+# Written by `python -m src.services.silero_vad`
+SILERO_VAD_INT8_MODEL_PATH = os.path.join(MODELS_DIR, "silero_vad.int8.onnx")
+
+# Largest speech-probability change the INT8 export may introduce on the
+# reference signal. Well below the 0.6 confidence threshold's margins.
+INT8_MAX_PROBABILITY_DELTA = 0.1
+
+
+def packaged_model_path() -> str:
+    """Return the path of the FP32 Silero VAD model shipped with pipecat."""
+    return str(files("pipecat.audio.vad.data").joinpath("silero_vad.onnx"))
+
+
+def model_op_types(model_path: str) -> set:
+    """Return every op type in a model, including those inside subgraphs."""
+    import onnx
+
+    op_types = set()
+    graphs = [onnx.load(model_path).graph]
+    while graphs:
+        for node in graphs.pop().node:
+            op_types.add(node.op_type)
+            graphs.extend(
+                attr.g
+                for attr in node.attribute
+                if attr.type == onnx.AttributeProto.GRAPH
+            )
+    return op_types
+
+
+def reference_audio(sample_rate: int, seconds: float = 6.0) -> np.ndarray:
+    """
+    Build a deterministic speech-like test signal.
+
+    Harmonic bursts on a gliding pitch, gated on and off, over low noise, so
+    the VAD's probabilities swing across the whole range.
+    """
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    phase = 2 * np.pi * np.cumsum(120 + 30 * np.sin(2 * np.pi * 0.7 * t)) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 15))
+    gate = (np.sin(2 * np.pi * 2.5 * t) > 0) * (t % 3 < 2)
+    noise = np.random.default_rng(0).standard_normal(len(t))
+    return (0.3 * voiced * gate + 0.01 * noise).astype(np.float32)
+
+
+def speech_probabilities(
+    session: ort.InferenceSession, audio: np.ndarray, sample_rate: int
+) -> np.ndarray:
+    """Run the VAD over `audio` window by window and return each probability."""
+    model = _SessionSileroOnnxModel(session)
+    window = 512 if sample_rate == 16000 else 256
+    return np.array(
+        [
+            model(audio[None, start : start + window], sample_rate)[0, 0]
+            for start in range(0, len(audio) - window + 1, window)
+        ]
+    )
+
+
+def quantize_silero_vad(output_path: str = SILERO_VAD_INT8_MODEL_PATH) -> str:
+    """
+    Export an INT8 dynamic-quantized copy of pipecat's Silero VAD model.
+
+    The weights sit in Constant nodes inside one If branch per sample rate,
+    so the model is constant-folded by ORT's quantization pre-processing
+    first and then quantized with EnableSubgraph. Only the LSTM weights are
+    quantized: ORT has no signed ConvInteger kernel, and dynamically
+    quantizing the Conv inputs (STFT magnitudes) moved probabilities by up
+    to 0.45.
+
+    The export is checked against the FP32 model before it is moved into
+    place, so a bad export never replaces a good one.
+
+    Args:
+        output_path (str): Where to write the quantized model.
+
+    Returns:
+        str: The path of the written model.
+
+    Raises:
+        RuntimeError: If the export is not smaller than the FP32 model or its
+            probabilities drift more than INT8_MAX_PROBABILITY_DELTA.
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        folded_path = os.path.join(tmp_dir, "folded.onnx")
+        quantized_path = os.path.join(tmp_dir, "int8.onnx")
+        quant_pre_process(packaged_model_path(), folded_path, skip_symbolic_shape=True)
+        quantize_dynamic(
+            model_input=folded_path,
+            model_output=quantized_path,
+            op_types_to_quantize=["LSTM"],
+            weight_type=QuantType.QInt8,
+            extra_options={"EnableSubgraph": True},
+        )
+
+        fp32_size = os.path.getsize(packaged_model_path())
+        int8_size = os.path.getsize(quantized_path)
+        if int8_size >= fp32_size:
+            raise RuntimeError(
+                f"INT8 Silero VAD export is {int8_size} B, not smaller than FP32 {fp32_size} B"
+            )
+        for sample_rate in (8000, 16000):
+            audio = reference_audio(sample_rate)
+            delta = np.abs(
+                speech_probabilities(
+                    create_vad_session(packaged_model_path()), audio, sample_rate
+                )
+                - speech_probabilities(
+                    create_vad_session(quantized_path), audio, sample_rate
+                )
+            ).max()
+            if delta > INT8_MAX_PROBABILITY_DELTA:
+                raise RuntimeError(
+                    f"INT8 Silero VAD drifts {delta:.3f} from FP32 at {sample_rate} Hz"
+                )
+
+        os.replace(quantized_path, output_path)
+
+    logger.info(
+        f"Wrote INT8 Silero VAD model to {output_path} ({int8_size} B, FP32 {fp32_size} B)"
+    )
+    return output_path
+
+
+def vad_execution_providers() -> list:
+    """
+    Return the ORT execution providers for the VAD, best first.
+
+    OpenVINO is only available when `onnxruntime-openvino` replaces the stock
+    `onnxruntime` wheel, typically on Intel deployment hosts. The CPU provider
+    always stays in the list as a fallback.
+    """
+    providers = []
+    if "OpenVINOExecutionProvider" in ort.get_available_providers():
+        providers.append(
+            (
+                "OpenVINOExecutionProvider",
+                {"device_type": "CPU_FP32", "num_of_threads": 1},
+            )
+        )
+    providers.append("CPUExecutionProvider")
+    return providers
+
+
+def create_vad_session(model_path: str) -> ort.InferenceSession:
+    """
+    Create a single-threaded ONNX Runtime session for the VAD.
+
+    Each inference is a tiny 32 ms window, so it runs sequentially on one core
+    instead of waking an ORT thread pool per frame. Full graph optimization
+    takes milliseconds for this model, so it runs in memory at every boot
+    rather than being cached on disk where it could outlive an ORT upgrade.
+    """
+    sess_options = ort.SessionOptions()
+    sess_options.intra_op_num_threads = 1
+    sess_options.inter_op_num_threads = 1
+    sess_options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    sess_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+    return ort.InferenceSession(
+        model_path, sess_options=sess_options, providers=vad_execution_providers()
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def get_shared_vad_session() -> ort.InferenceSession:
+    """
+    Return the process-wide Silero VAD session.
+
+    InferenceSession.run() is thread-safe, so every call shares one copy of the
+    weights. Uses the INT8 model when it has been exported and loads, else the
+    FP32 one.
+    """
+    model_path = SILERO_VAD_INT8_MODEL_PATH
+    try:
+        session = create_vad_session(model_path)
+    except Exception as e:
+        logger.warning(
+            f"INT8 Silero VAD model not usable at {model_path} ({e}), using the FP32 model."
+        )
+        model_path = packaged_model_path()
+        session = create_vad_session(model_path)
+
+    logger.info(
+        f"Loaded shared Silero VAD model from {model_path} "
+        f"(providers: {session.get_providers()})"
+    )
+    return session
+
+
+class _SessionSileroOnnxModel(SileroOnnxModel):
+    """Silero model wrapper that only owns the per-call RNN state."""
+
+    def __init__(self, session: ort.InferenceSession):
+        self.session = session
+        self.sample_rates = [8000, 16000]
+        self.reset_states()
+
+
+class SharedSileroVADAnalyzer(SileroVADAnalyzer):
+    """Silero VAD analyzer that runs on a shared InferenceSession."""
+
+    def __init__(
+        self,
+        session: ort.InferenceSession,
+        *,
+        sample_rate: Optional[int] = None,
+        params: Optional[VADParams] = None,
+    ):
+        # Skip SileroVADAnalyzer.__init__, which loads a private copy of the model.
+        VADAnalyzer.__init__(self, sample_rate=sample_rate, params=params)
+        self._model = _SessionSileroOnnxModel(session)
+        self._last_reset_time = 0
+
+
+if __name__ == "__main__":
+    quantize_silero_vad()
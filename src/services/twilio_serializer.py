@@ -0,0 +1,151 @@
+import base64
+import collections
+import re
+from typing import Optional
+
+import numpy as np
+import orjson
+from pipecat.frames.frames import AudioRawFrame, Frame, InputAudioRawFrame
+from pipecat.serializers.twilio import TwilioFrameSerializer
+
+
+def _build_ulaw_to_pcm() -> np.ndarray:
+    """Build the 256-entry G.711 μ-law to 16-bit PCM decode table."""
+    ulaw = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((ulaw & 0x0F) << 3) + 0x84) << ((ulaw & 0x70) >> 4)
+    pcm = np.where(ulaw & 0x80, 0x84 - magnitude, magnitude - 0x84)
+    return pcm.astype(np.int16)
+
+
+def _build_pcm_to_ulaw() -> np.ndarray:
+    """Build the 65536-entry 16-bit PCM to G.711 μ-law encode table."""
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(pcm), 8159) + 33
+    segment = np.searchsorted(
+        np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), magnitude
+    )
+    ulaw = np.where(
+        segment < 8, (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F), 0x7F
+    )
+    return (ulaw ^ mask).astype(np.uint8)
+
+
+# Indexed by a μ-law byte and by a PCM sample viewed as uint16 respectively.
+_ULAW_TO_PCM = _build_ulaw_to_pcm()
+_PCM_TO_ULAW = _build_pcm_to_ulaw()
+
+
+# Twilio sends text frames, so these match the raw message without parsing it.
+_EVENT_RE = re.compile(r'"event"\s*:\s*"([^"]+)"')
+_PAYLOAD_RE = re.compile(r'"payload"\s*:\s*"([^"]*)"')
+
+# Twilio sends 20 ms frames: 160 μ-law bytes, i.e. 320 bytes of 16-bit PCM.
+TWILIO_FRAME_SAMPLES = 160
+
+
+class AudioBufferPool:
+    """
+    Bounded pool of reusable bytearrays for per-frame audio scratch space.
+
+    Buffers of any other size are allocated fresh and dropped on release, so
+    odd-sized frames still convert correctly.
+    """
+
+    def __init__(self, size: int, count: int):
+        self.size = size
+        self._buffers = collections.deque(
+            (bytearray(size) for _ in range(count)), maxlen=count
+        )
+
+    def acquire(self, size: int) -> bytearray:
+        if size != self.size or not self._buffers:
+            return bytearray(size)
+        return self._buffers.popleft()
+
+    def release(self, buffer: bytearray):
+        if len(buffer) == self.size:
+            self._buffers.append(buffer)
+
+
+def ulaw_to_pcm(ulaw_bytes: bytes, pool: Optional[AudioBufferPool] = None) -> bytes:
+    """Decode 8-bit μ-law audio to 16-bit PCM with one table gather."""
+    indices = np.frombuffer(ulaw_bytes, dtype=np.uint8)
+    if pool is None:
+        return _ULAW_TO_PCM[indices].tobytes()
+
+    buffer = pool.acquire(len(ulaw_bytes) * 2)
+    try:
+        np.take(_ULAW_TO_PCM, indices, out=np.frombuffer(buffer, dtype=np.int16))
+        return bytes(buffer)
+    finally:
+        pool.release(buffer)
+
+
+def pcm_to_ulaw(pcm_bytes: bytes, pool: Optional[AudioBufferPool] = None) -> bytes:
+    """Encode 16-bit PCM audio to 8-bit μ-law with one table gather."""
+    indices = np.frombuffer(pcm_bytes, dtype=np.uint16)
+    if pool is None:
+        return _PCM_TO_ULAW.take(indices).tobytes()
+
+    buffer = pool.acquire(len(indices))
+    try:
+        np.take(_PCM_TO_ULAW, indices, out=np.frombuffer(buffer, dtype=np.uint8))
+        return bytes(buffer)
+    finally:
+        pool.release(buffer)
+
+
+class LookupTableTwilioFrameSerializer(TwilioFrameSerializer):
+    """
+    TwilioFrameSerializer that converts 8 kHz audio through lookup tables.
+
+    When the pipeline already runs at Twilio's sample rate there is nothing to
+    resample, so each media frame is a single NumPy gather. Any other rate goes
+    through the stock resampling path.
+
+    The gathers write into pooled scratch buffers. Frames outlive this call,
+    so each one still gets its own immutable copy of the audio.
+
+    Outbound media messages only differ in their payload, so the JSON around
+    it is encoded once per stream and the base64 text is spliced in.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pcm_pool = AudioBufferPool(TWILIO_FRAME_SAMPLES * 2, 4)
+        self._ulaw_pool = AudioBufferPool(TWILIO_FRAME_SAMPLES, 4)
+        # base64 never needs JSON escaping, so the payload can sit between
+        # these two fixed halves as-is.
+        self._media_prefix = (
+            '{"event":"media","streamSid":'
+            + orjson.dumps(self._stream_sid).decode("utf-8")
+            + ',"media":{"payload":"'
+        )
+
+    async def serialize(self, frame: Frame) -> str | bytes | None:
+        if (
+            isinstance(frame, AudioRawFrame)
+            and frame.sample_rate == self._twilio_sample_rate
+        ):
+            ulaw = pcm_to_ulaw(frame.audio, self._ulaw_pool)
+            payload = base64.b64encode(ulaw).decode("ascii")
+            return self._media_prefix + payload + '"}}'
+        return await super().serialize(frame)
+
+    async def deserialize(self, data: str | bytes) -> Frame | None:
+        if self._sample_rate != self._twilio_sample_rate or not isinstance(data, str):
+            return await super().deserialize(data)
+
+        # Media frames are nearly all the traffic; pull the payload out with a
+        # regex scan instead of building the whole message dict.
+        event = _EVENT_RE.search(data)
+        payload = _PAYLOAD_RE.search(data) if event and event[1] == "media" else None
+        if payload is None:
+            return await super().deserialize(data)
+
+        return InputAudioRawFrame(
+            audio=ulaw_to_pcm(base64.b64decode(payload[1]), self._pcm_pool),
+            num_channels=1,
+            sample_rate=self._sample_rate,
+        )
@@ -0,0 +1,16 @@
+from uvicorn.workers import UvicornWorker
+
+# Twilio media streams are small, steady mu-law frames. Compressing them costs
+# CPU per frame for no size win, and a 1 MiB cap is far above any real message.
+WEBSOCKET_SETTINGS = {
+    "ws_per_message_deflate": False,
+    "ws_ping_interval": 20,
+    "ws_ping_timeout": 20,
+    "ws_max_size": 2**20,
+}
+
+
+class TwilioUvicornWorker(UvicornWorker):
+    """Gunicorn worker that serves the app with the Twilio websocket settings."""
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, **WEBSOCKET_SETTINGS}
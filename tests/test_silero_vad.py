@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("pipecat")
+
+from src.services import silero_vad
+
+
+def test_shared_session_loads_quantized_model(tmp_path, monkeypatch):
+    int8_path = silero_vad.quantize_silero_vad(str(tmp_path / "silero_vad.int8.onnx"))
+    monkeypatch.setattr(silero_vad, "SILERO_VAD_INT8_MODEL_PATH", int8_path)
+    silero_vad.get_shared_vad_session.cache_clear()
+    try:
+        session = silero_vad.get_shared_vad_session()
+    finally:
+        silero_vad.get_shared_vad_session.cache_clear()
+
+    op_types = silero_vad.model_op_types(session._model_path)
+    assert "DynamicQuantizeLSTM" in op_types
+    assert "LSTM" not in op_types
+    assert os.path.getsize(int8_path) < os.path.getsize(
+        silero_vad.packaged_model_path()
+    )